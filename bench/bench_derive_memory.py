@@ -0,0 +1,98 @@
+"""
+Peak RSS of computed tabs (histograms) derived from a large loaded file.
+
+python bench/bench_derive_memory.py [size_MB] [ntabs]
+ex: python bench/bench_derive_memory.py 1000 20
+
+A 2d sweep of about `size_MB` MB is built in memory, then `ntabs` histograms
+are derived from it like FilterTreeView does (from_computed_array_1d/2d).
+Each tab should only cost its histogram, not a copy of the source:
+the peak RSS growth is checked against `ntabs` * the source size / 10.
+Unix only (resource.getrusage).
+"""
+import os
+import sys
+import resource
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ReadfileData import ReadfileData
+from src.SweepData import SweepData, Axis, Outs
+
+NOUTS = 4
+INNER_NPTS = 1001
+BINS = 100
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def make_source(size_mb) -> ReadfileData:
+    """ 2d sweep of NOUTS outs, about `size_mb` MB """
+    outer_npts = max(2, int(size_mb * 2**20 / 8 / NOUTS / INNER_NPTS))
+    rng = np.random.default_rng(0)
+    store = rng.random((NOUTS, outer_npts, INNER_NPTS))
+    titles = [f"out{i}" for i in range(NOUTS)]
+    data_dict = SweepData(
+        sweep_dim=2,
+        x=Axis("x", np.arange(outer_npts, dtype=float)),
+        y=Axis("y", np.linspace(-1, 1, INNER_NPTS)),
+        out=Outs(titles, list(store), store),
+    )
+    rfdata = ReadfileData("bench.txt", None, None, data_dict, lambda: [data_dict], 0)
+    rfdata.plot_dict = {
+        "img": store[0], "extent": [-1, 1, 0, outer_npts - 1],
+        "y_title": "x", "z_title": "out0",
+    }
+    return rfdata
+
+
+def derive_tabs(rfdata, ntabs) -> list:
+    """ alternately a flattened (1d) and a line by line (2d) histogram, see FilterTreeView """
+    img = rfdata.plot_dict["img"]
+    extent = rfdata.plot_dict["extent"]
+    tabs = []
+    for i in range(ntabs):
+        if i % 2 == 0:
+            hist, bins = np.histogram(img, bins=BINS)
+            tabs.append(ReadfileData.from_computed_array_1d(
+                out_datas=[(bins[:-1] + bins[1:]) / 2, hist],
+                out_titles=["out0 bins", "count"],
+                rfdata_original=rfdata,
+            ))
+        else:
+            bins = np.histogram(img, bins=BINS)[1]
+            hists_rows = np.array([np.histogram(row, bins=bins)[0] for row in img])
+            tabs.append(ReadfileData.from_computed_array_2d(
+                x_title="x", x_1d_data=np.linspace(extent[2], extent[3], img.shape[0]),
+                y_title="out0 bins", y_1d_data=(bins[:-1] + bins[1:]) / 2,
+                out_titles=["count"], out_datas=[hists_rows],
+                rfdata_original=rfdata,
+                data_dict_updates=dict(alternate=False),
+            ))
+    return tabs
+
+
+def main(size_mb, ntabs):
+    rfdata = make_source(size_mb)
+    source_mb = rfdata.data_dict.out.store.nbytes / 2**20
+    before = peak_rss_mb()
+    tabs = derive_tabs(rfdata, ntabs)
+    after = peak_rss_mb()
+
+    growth = after - before
+    limit = ntabs * source_mb / 10
+    print(f"source: {source_mb:.0f} MB, {len(tabs)} tabs")
+    print(f"peak RSS: {before:.0f} MB -> {after:.0f} MB (+{growth:.0f} MB, {growth / ntabs:.1f} MB/tab)")
+    if growth > limit:
+        print(f"REGRESSION: more than {limit:.0f} MB, the tabs copy the source")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    args = [int(s) for s in sys.argv[1:]]
+    main(*(args + [1000, 20][len(args):]))
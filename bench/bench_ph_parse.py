@@ -0,0 +1,70 @@
+"""
+Compare the native pyHegel text parser (ph_parseColumns, used by PhTailReader) with pyHegel.commands.readfile.
+
+python bench/bench_ph_parse.py [size_MB ...]
+ex: python bench/bench_ph_parse.py 10 100 1000
+
+Files are 2d multi sweeps generated in a temporary directory and removed after.
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ReadfileData import ph_parseColumns, ph_readfilePyHegel, map_file
+
+NCOLS = 6
+INNER_NPTS = 501
+HEADER = (
+    "#comment:= bench file\n"
+    "#sweep_multi_options:= {'beforewait': [0.02, 0.02], 'updown': [False, False]};\n"
+    "#readback numpy shape for line part: 4\n"
+    "#dev1\tdev2\tout1\tout2\tout3\ttime\n"
+)
+
+
+def write_file(path, size_mb):
+    """ write a 2d multi sweep of about `size_mb` MB """
+    rng = np.random.default_rng(0)
+    inner = np.linspace(-1, 1, INNER_NPTS)
+    with open(path, "w") as f:
+        f.write(HEADER)
+        i = 0
+        while f.tell() < size_mb * 1e6:
+            block = np.empty((INNER_NPTS, NCOLS))
+            block[:, 0] = i
+            block[:, 1] = inner
+            block[:, 2:-1] = rng.random((INNER_NPTS, NCOLS - 3))
+            block[:, -1] = time.time()
+            np.savetxt(f, block, delimiter="\t", fmt="%.18e")
+            i += 1
+
+
+def timeit(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def native(path):
+    with map_file(path) as buffer:
+        return ph_parseColumns(buffer)
+
+
+def main(sizes):
+    print(f"{'size (MB)':>10} {'native (s)':>12} {'pyHegel (s)':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"bench_{size}MB.txt")
+            write_file(path, size)
+            t_native = timeit(native, path)
+            t_ph = timeit(ph_readfilePyHegel, path)
+            print(f"{os.path.getsize(path)/1e6:>10.0f} {t_native:>12.2f} {t_ph:>12.2f} {t_ph/t_native:>8.1f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [10, 100, 1000])
@@ -1,5 +1,5 @@
 from PyQt5.QtWidgets import QApplication, QSplashScreen
-from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtCore import QObject, Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QIcon
 
 import os
@@ -9,9 +9,15 @@ from typing import Optional
 
 from views.MainView import MainView
 from src.ReadfileData import ReadfileData
-from src.QuickThread import QuickThread
+from src.LoadScheduler import LoadScheduler
 from src.Popup import Popup
 from src.Database import DBPlots
+from src.ParseCache import ParseCache
+from src.BulkLoader import BulkLoader
+from src.H5Pool import H5_POOL
+from src.H5Probe import H5Probe
+from src.Thumbnail import ThumbnailRenderer
+from src.Crawler import Crawler
 
 
 class hlog(QObject):
@@ -22,17 +28,47 @@ class hlog(QObject):
         self.app = app
 
         project_dir = os.path.dirname(os.path.abspath(__file__))
-        db_path = os.path.join(project_dir, "plots.db")
+        # one store can be shared by the hlog instances of this computer (see DBPlots on network drives)
+        db_path = os.environ.get("HLOG_DB", os.path.join(project_dir, "plots.db"))
         self.db = DBPlots(db_path)
+        self.parse_cache = ParseCache(os.path.join(project_dir, "cache"))
 
         self.main_view = mv = MainView(self)
         self.pop = Popup()
 
-        self.loading_thread = None
+        self.load_scheduler = LoadScheduler(
+            lambda path, loading_kwargs, task: ReadfileData.from_filepath(
+                path, loading_kwargs, cache=self.parse_cache, task=task
+            )
+        )
+        self.bulk_loader = BulkLoader(cache=self.parse_cache)
+        self.h5_probe = H5Probe()
+        self.thumbnails = ThumbnailRenderer(self.db)
+        # indexes the file tree root, paused while files are being opened or reloaded
+        self.crawler = Crawler(self.db, busy=lambda: (
+            self.load_scheduler.depth() > 0 or self.bulk_loader.depth() > 0 or self.main_view.reloads > 0
+        ))
         self.current_data = None # for debug
 
+        # idle pooled hdf5 files are closed, not to lock them for their writers
+        self.h5_pool_timer = QTimer()
+        self.h5_pool_timer.timeout.connect(H5_POOL.closeIdle)
+        self.h5_pool_timer.start(H5_POOL.idle_s * 1000)
+
         # SIGNALS ingoing from views
         mv.file_tree.sig_askOpenFile.connect(self.openFile)
+        mv.file_tree.sig_askOpenFiles.connect(self.openFiles)
+        self.load_scheduler.sig_loaded.connect(self.onFileOpened)
+        self.load_scheduler.sig_error.connect(self.onFileOpenError)
+        self.load_scheduler.sig_queueChanged.connect(mv.setLoadQueueDepth)
+        self.load_scheduler.sig_progress.connect(self.onFileProgress)
+        self.load_scheduler.sig_partial.connect(self.onFilePartial)
+        self.bulk_loader.sig_loaded.connect(self.onBulkFileOpened)
+        self.bulk_loader.sig_error.connect(self.onBulkFileOpenError)
+        self.h5_probe.sig_probed.connect(mv.file_tree.onProbed)
+        mv.file_tree.sig_rootChanged.connect(self.crawler.setRoot)
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
 
         # SIGNALS outgoing
         self.sig_fileOpened.connect(mv.onFileOpened)
@@ -46,27 +82,51 @@ class hlog(QObject):
     def openFile(self, path, loading_kwargs={}):
         self.main_view.write("Opening file: " + path)
 
-        # ReadfileData in a thread
-        # ReadfileData.from_filepath(path)
-        self.loading_thread = QuickThread(ReadfileData.from_filepath, filepath=path, loading_kwargs=loading_kwargs)
-        self.loading_thread.sig_finished.connect(self.onFileOpened)
-        self.loading_thread.sig_error.connect(self.onFileOpenError)
-        self.loading_thread.start()
+        # ReadfileData in a thread, superseded requests are cancelled
+        self.load_scheduler.request(path, loading_kwargs, new_tab=self.main_view.file_tree.new_tab_asked)
+        self.main_view.file_tree.new_tab_asked = False
 
-        # else:
-        #    self.main_view.write('File type not supported :(\n'+path)
+    def openFiles(self, paths, loading_kwargs={}):
+        # parsed in parallel, each file opens in a new tab when ready
+        self.main_view.write(f"Opening {len(paths)} files")
+        self.bulk_loader.load(paths, loading_kwargs)
 
-    def onFileOpened(self, rfdata_list, fn_args, fn_kwargs):
-        # called on thread success
-        filepath = fn_kwargs.get("filepath")
+    def onBulkFileOpened(self, rfdata_list, filepath):
         self.main_view.write("Opened: " + filepath)
+        for rfdata in rfdata_list:
+            self.sig_fileOpened.emit(rfdata, True)
+
+    def onBulkFileOpenError(self, exception, filepath):
+        self.reportOpenError(exception, filepath)
+
+    def onFileProgress(self, fraction, request):
+        if not request.task.cancelled:
+            self.main_view.write(f"Opening file: {request.path} {fraction:.0%}")
+
+    def onFilePartial(self, rfdata_list, request):
+        # big file: first lines shown while the rest is loaded
+        if request.task.cancelled:
+            return
+        request.partial = rfdata_list
+        for rfdata in rfdata_list:
+            self.main_view.onFileOpened(rfdata, request.new_tab, add_to_db=False)
+
+    def onFileOpened(self, rfdata_list, request):
+        # called on load success, if not superseded
+        self.main_view.write("Opened: " + request.path)
         self.current_data = rfdata_list
+        if request.partial and len(request.partial) == len(rfdata_list):
+            # swapped in the tabs of the partial version
+            for partial, rfdata in zip(request.partial, rfdata_list):
+                self.main_view.onFileRefined(partial, rfdata)
+            return
         for rfdata in rfdata_list:
-            self.sig_fileOpened.emit(rfdata, self.main_view.file_tree.new_tab_asked)
-        self.main_view.file_tree.new_tab_asked = False
+            self.sig_fileOpened.emit(rfdata, request.new_tab)
+
+    def onFileOpenError(self, exception, request):
+        self.reportOpenError(exception, request.path)
 
-    def onFileOpenError(self, exception, fn_args, fn_kwargs):
-        filepath = fn_kwargs.get("filepath")
+    def reportOpenError(self, exception, filepath):
         self.main_view.write("Could not open file: " + filepath)
         print(exception)
         traceback.print_exception(
@@ -76,7 +136,14 @@ class hlog(QObject):
         )
 
     def close(self):
-        pass
+        self.load_scheduler.cancelAll()
+        self.bulk_loader.shutdown()
+        self.h5_probe.shutdown()
+        self.thumbnails.shutdown()
+        self.crawler.stop()
+        self.db.close()
+        self.h5_pool_timer.stop()
+        H5_POOL.closeAll()
 
 
 if __name__ == "__main__":
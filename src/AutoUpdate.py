@@ -0,0 +1,27 @@
+class AutoUpdatePolicy:
+    """
+    Polling interval of a tab auto update.
+
+    Every tick only checks the file stat (ReadfileData.file_changed), the file
+    is reloaded and replotted on change only. The interval shrinks when a change
+    is seen and grows when none is, so it settles around the write period of
+    the file; a finished measurement ends up polled every MAX_MS.
+    It is never shorter than COST_FACTOR times the cost of a reload + render.
+    """
+
+    MIN_MS = 250
+    MAX_MS = 30_000
+    SPEEDUP = 0.5 # interval factor on a tick with change
+    BACKOFF = 1.5 # interval factor on a tick without change
+    COST_FACTOR = 4 # at most 1/COST_FACTOR of the time spent reloading/rendering
+
+    def __init__(self, interval_ms=2000):
+        self.interval_ms = interval_ms
+
+    def onChanged(self, cost_ms):
+        """ the file changed, reloading and rendering it took `cost_ms` """
+        lower = max(self.MIN_MS, self.COST_FACTOR * cost_ms)
+        self.interval_ms = int(min(max(self.interval_ms * self.SPEEDUP, lower), self.MAX_MS))
+
+    def onUnchanged(self):
+        self.interval_ms = int(min(self.interval_ms * self.BACKOFF, self.MAX_MS))
@@ -0,0 +1,218 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from src.ReadfileData import (
+    ReadfileData, PhTailReader, FINGERPRINTS,
+    fingerprint_file, hash_file, map_file, ph_allocColumns
+)
+
+
+class BulkLoader(QObject):
+    """
+    Opens many files at once on a pool of processes, so pyHegel files are parsed in parallel.
+
+    Workers parse the text into a shared memory block, the parsed columns are
+    copied from it once, never pickled. The worker keeps the block opened until
+    it is copied (see worker_holdBlock). For hdf5 files, only the fingerprint
+    (hash of the whole file) is computed by the workers, the data is read lazily.
+
+    Results are finished (copy, rfdata, parse cache) on a thread pool, not on the
+    executor thread that delivers them: a big file does not delay the others.
+    Files found in the parse cache are built on that pool too, not in the gui thread.
+    sig_loaded/sig_error are emitted in completion order, from those threads.
+    """
+
+    sig_loaded = pyqtSignal(object, str) # rfdata_list, filepath
+    sig_error = pyqtSignal(object, str) # exception, filepath
+
+    def __init__(self, cache=None, max_workers=None):
+        super().__init__()
+        self.cache = cache
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._pool = None
+        self._post = None # threads finishing the results
+        self._in_flight = 0 # files asked, not emitted yet
+        self._in_flight_lock = threading.Lock()
+
+    def _getPool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a Qt application is not safe
+            self._pool = ProcessPoolExecutor(
+                self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _getPost(self) -> ThreadPoolExecutor:
+        if self._post is None:
+            self._post = ThreadPoolExecutor(self.max_workers, thread_name_prefix="BulkLoader")
+        return self._post
+
+    def load(self, filepaths, loading_kwargs:dict={}):
+        pool, post = self._getPool(), self._getPost()
+        with self._in_flight_lock:
+            self._in_flight += len(filepaths)
+        for filepath in filepaths:
+            if filepath.endswith(".hdf5"):
+                self._submit(pool, post, filepath, loading_kwargs, worker_hashFile, (filepath,), self._onHdf5Hashed)
+            else:
+                # a cached file is built here too (memory mapped columns, sweep time scan)
+                post.submit(self._loadText, pool, post, filepath, loading_kwargs)
+
+    def depth(self) -> int:
+        """ files being opened, see Crawler busy """
+        return self._in_flight
+
+    def _emitLoaded(self, rfdata_list, filepath):
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self.sig_loaded.emit(rfdata_list, filepath)
+
+    def _emitError(self, exception, filepath):
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self.sig_error.emit(exception, filepath)
+
+    def _submit(self, pool, post, filepath, loading_kwargs, fn, args, done):
+        """ fn(*args) on the process pool, its result finished by done() on the post threads """
+        try:
+            future = pool.submit(fn, *args)
+        except Exception as e:
+            self._emitError(e, filepath)
+            return
+        future.add_done_callback(
+            lambda future: post.submit(self._onDone, future, done, filepath, loading_kwargs)
+        )
+
+    def _loadText(self, pool, post, filepath, loading_kwargs):
+        """ from the parse cache, else parsed on the process pool """
+        try:
+            rfdata_list = self._loadFromCache(filepath, loading_kwargs)
+        except Exception as e:
+            self._emitError(e, filepath)
+            return
+        if rfdata_list is not None:
+            self._emitLoaded(rfdata_list, filepath)
+        else:
+            self._submit(pool, post, filepath, loading_kwargs, worker_parseText, (filepath, loading_kwargs), self._onTextParsed)
+
+    def _onDone(self, future, done, filepath, loading_kwargs):
+        try:
+            rfdata_list = done(future.result(), filepath, loading_kwargs)
+        except Exception as e:
+            self._emitError(e, filepath)
+            return
+        self._emitLoaded(rfdata_list, filepath)
+
+    def _loadFromCache(self, filepath, loading_kwargs):
+        if self.cache is None:
+            return None
+        metadata = os.stat(filepath)
+        h = self.cache.fingerprint(filepath, metadata)
+        if (state := self.cache.load(h)) is None:
+            return None
+        FINGERPRINTS[filepath] = (metadata.st_size, metadata.st_mtime_ns, h)
+        load_function = PhTailReader(filepath, loading_kwargs)
+        data_dicts = load_function.load_state(state)
+        return ReadfileData.from_loaded(filepath, metadata, h, load_function, data_dicts)
+
+    def _onHdf5Hashed(self, result, filepath, loading_kwargs):
+        metadata, h = result
+        FINGERPRINTS[filepath] = (metadata.st_size, metadata.st_mtime_ns, h)
+        return ReadfileData.from_filepath(filepath, loading_kwargs)
+
+    def _onTextParsed(self, result, filepath, loading_kwargs):
+        metadata, h, state, (shm_name, shape, dtype) = result
+        load_function = PhTailReader(filepath, loading_kwargs)
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            shared = np.ndarray(shape, dtype, buffer=shm.buf, offset=BLOCK_HEADER_BYTES)
+            # own buffer: it is extended in place on reload
+            columns = ph_allocColumns(shape[0], shape[1], load_function._outOfCore(metadata.st_size))
+            columns[...] = shared
+            del shared
+        finally:
+            # copied, the worker can close its handle
+            shm.buf[0] = 1
+            shm.close()
+            shm.unlink()
+
+        state["columns"] = columns
+        FINGERPRINTS[filepath] = (metadata.st_size, metadata.st_mtime_ns, h)
+        data_dicts = load_function.load_state(state)
+        if self.cache:
+            self.cache.save(filepath, metadata, h, load_function.get_state())
+        return ReadfileData.from_loaded(filepath, metadata, h, load_function, data_dicts)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._post is not None:
+            self._post.shutdown(wait=False, cancel_futures=True)
+            self._post = None
+
+
+# -- run in the pool processes --
+def worker_hashFile(filepath):
+    return os.stat(filepath), hash_file(filepath)
+
+def worker_parseText(filepath, loading_kwargs):
+    """ parse a pyHegel file, the columns are returned in a shared memory block
+    (after BLOCK_HEADER_BYTES) that the caller must flag as copied and unlink.
+    """
+    metadata = os.stat(filepath)
+    reader = PhTailReader(filepath, loading_kwargs)
+    with map_file(filepath) as buffer:
+        h = fingerprint_file(filepath, metadata, buffer)
+        reader(buffer)
+    state = reader.get_state()
+    columns = state.pop("columns")
+
+    shm = shared_memory.SharedMemory(create=True, size=BLOCK_HEADER_BYTES + columns.nbytes)
+    try:
+        shm.buf[0] = 0
+        np.ndarray(columns.shape, columns.dtype, buffer=shm.buf, offset=BLOCK_HEADER_BYTES)[...] = columns
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    worker_holdBlock(shm)
+    return metadata, h, state, (shm.name, columns.shape, columns.dtype.str)
+
+
+# Windows destroys a shared memory block with its last handle: the worker
+# cannot close its own before the caller has opened and copied it.
+# The first byte of the block is set by the caller once copied.
+BLOCK_HEADER_BYTES = 8 # keeps the columns aligned
+HOLD_CHECK_S = 0.05
+HOLD_TIMEOUT_S = 600 # the caller is gone (shut down)
+_held_blocks = [] # (SharedMemory, deadline)
+_held_lock = threading.Lock()
+_held_thread = None
+
+def worker_holdBlock(shm):
+    """ keep `shm` opened until its caller has copied it """
+    global _held_thread
+    with _held_lock:
+        _held_blocks.append((shm, time.monotonic() + HOLD_TIMEOUT_S))
+        if _held_thread is None:
+            _held_thread = threading.Thread(target=worker_releaseBlocks, name="BulkLoader.hold", daemon=True)
+            _held_thread.start()
+
+def worker_releaseBlocks():
+    while True:
+        time.sleep(HOLD_CHECK_S)
+        now = time.monotonic()
+        with _held_lock:
+            for shm, deadline in list(_held_blocks):
+                if shm.buf[0] or now > deadline:
+                    _held_blocks.remove((shm, deadline))
+                    shm.close()
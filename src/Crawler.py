@@ -0,0 +1,152 @@
+import os
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.ReadfileData import ReadfileData, fingerprint_file, H5_CHANNEL_CACHE
+from src.H5Pool import H5_POOL
+
+
+class Crawler:
+    """
+    Indexes the files under the root of the file tree in the background:
+    thumbnail (DBPlots.add_fig), summary and search text (DBPlots.add_file) of
+    every .txt/.hdf5, so the preview and the search have them before the file
+    is ever opened.
+
+    - incremental: a file is loaded again only if its size or mtime changed,
+      and only re-rendered if its fingerprint changed too
+    - resumable: the progress is the `files` table of the db, a restarted
+      crawl skips the files indexed before with one stat and one lookup
+    - throttled: one file at a time on a single low priority process, paused
+      while `busy()` (interactive loads running) and THROTTLE_S between files
+
+    The walk runs in a thread, setRoot restarts it on another directory.
+    """
+
+    EXTENSIONS = (".txt", ".hdf5")
+    THROTTLE_S = 0.2
+    BUSY_WAIT_S = 1.0
+    MAX_FILE_BYTES = 2**29 # bigger files are only indexed when opened
+
+    def __init__(self, db, busy=lambda: False):
+        self.db = db
+        self.busy = busy
+        self.root = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+
+    def _getPool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a Qt application is not safe
+            self._pool = ProcessPoolExecutor(
+                1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=worker_lowerPriority,
+            )
+        return self._pool
+
+    def setRoot(self, root):
+        if root == self.root and self._thread is not None and self._thread.is_alive():
+            return
+        # the previous walk stops after its current file
+        self._stop.set()
+        self.root = root
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._crawl, args=(root, self._stop), name="Crawler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _crawl(self, root, stop: threading.Event):
+        for filepath in walk_files(root, self.EXTENSIONS, stop):
+            while self.busy() and not stop.is_set():
+                stop.wait(self.BUSY_WAIT_S)
+            if stop.is_set():
+                return
+            try:
+                self._index(filepath, stop)
+            except Exception as e:
+                if stop.is_set():
+                    return # pool shut down
+                print("Crawler: could not index", filepath, e)
+            stop.wait(self.THROTTLE_S)
+
+    def _index(self, filepath, stop: threading.Event):
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return
+        known = self.db.file_state(filepath)
+        if known is not None and tuple(known[:2]) == (st.st_size, st.st_mtime_ns):
+            return
+        if st.st_size > self.MAX_FILE_BYTES:
+            self.db.add_file(filepath, st.st_size, st.st_mtime_ns, None, json.dumps({"skipped": "size"}))
+            return
+
+        known_h = known[2] if known is not None else None
+        try:
+            h, summary, search, image = self._getPool().submit(worker_indexFile, filepath, known_h).result()
+        except Exception as e:
+            # not retried until the file changes
+            if not stop.is_set():
+                self.db.add_file(filepath, st.st_size, st.st_mtime_ns, None, json.dumps({"error": str(e)}))
+            raise
+        self.db.add_file(filepath, st.st_size, st.st_mtime_ns, h, summary, search)
+        if image is not None:
+            self.db.add_fig(filepath, h, image)
+
+
+def walk_files(root, extensions, stop: threading.Event):
+    """ files of `root` with `extensions`, recursively, in a stable order (sorted) """
+    for dirpath, dirnames, filenames in os.walk(root):
+        if stop.is_set():
+            return
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.endswith(extensions):
+                yield os.path.join(dirpath, filename)
+
+
+# -- run in the pool process --
+BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+
+def worker_lowerPriority():
+    if hasattr(os, "nice"):
+        os.nice(10)
+    elif os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS)
+
+def worker_indexFile(filepath, known_h=None):
+    """ (fingerprint, summary json, search text, thumbnail png), all but the
+    fingerprint None if it is `known_h` (touched, same content).
+    Nothing is kept opened or cached after: no hlog timer closes the idle
+    H5_POOL handles in this process, and the file is not read again.
+    """
+    from src.Thumbnail import render_thumbnail
+
+    h = fingerprint_file(filepath)
+    if h == known_h:
+        return h, None, None, None
+    rfdata_list = []
+    try:
+        rfdata_list = ReadfileData.from_filepath(filepath)
+        summary = json.dumps([rfdata.summary() for rfdata in rfdata_list])
+        # one entry per file: the texts of its data_dicts joined
+        texts = [rfdata.search_text() for rfdata in rfdata_list]
+        search = {column: "\n".join(text[column] for text in texts) for column in (texts[0] if texts else {})}
+        image = render_thumbnail(rfdata_list[0].default_plot_dict()) if rfdata_list else None
+    finally:
+        for rfdata in rfdata_list:
+            rfdata.close()
+        H5_POOL.closeAll()
+        H5_CHANNEL_CACHE.invalidate(filepath)
+    return h, summary, search, image
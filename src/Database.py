@@ -1,63 +1,383 @@
+import os
+import time
 import sqlite3
-import hashlib
-import io
-
-def fig_to_bytes(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
-    return buf.read()
+import threading
+import queue
 
 class DBPlots:
-    def __init__(self, db_path="plots.db"):
-        self.db = sqlite3.connect(db_path)
-        self.cur = self.db.cursor()
-        self.cur.execute("""
+    """ Thumbnails of the opened files, keyed by filepath and content hash (rfdata.h).
+    Images are small png rendered by src.Thumbnail.ThumbnailRenderer.
+    Paths are stored as db_filepath: the gui (QFileSystemModel, '/') and the
+    Crawler (os.walk, native separator) find the same rows.
+
+    Safe to share between threads and hlog instances:
+    - the db is in WAL mode, readers never wait for the writer. WAL needs all
+      the processes on the same host: on a network file system (is_network_path)
+      the db uses a rollback journal instead, readers then give up while a
+      write is in progress
+    - every thread has its own connection
+    - writes are queued and done by one writer thread, batched in one
+      transaction (at most WRITE_BATCH writes, waiting WRITE_DELAY_S for more)
+    Reads from the gui give up after READ_TIMEOUT_S if the db is locked
+    (another process checkpointing), returning nothing instead of blocking.
+
+    The thumbnails are bounded by `max_bytes`: every MAINTENANCE_S the writer
+    evicts the least recently viewed ones (last_access, updated by get_fig),
+    the ones of deleted files (ORPHAN_CHECKS paths checked per pass) and
+    gives the freed pages back to the file system (incremental vacuum).
+
+    The `files` table is the index of the Crawler: stat, fingerprint and
+    summary (ReadfileData.summary, json) of every crawled file.
+    `search` is its full text index (fts5, rowid = files.id) over the
+    ReadfileData.search_text columns, queried by search().
+    """
+
+    SEARCH_COLUMNS = ("header", "axes", "titles", "dims", "date")
+    SEARCH_LIMIT = 10000
+
+    WRITE_BATCH = 256
+    WRITE_DELAY_S = 0.2
+    WRITE_TIMEOUT_S = 30 # writers of other processes are waited that long
+    READ_TIMEOUT_S = 0.1
+    MAINTENANCE_S = 60
+    ORPHAN_CHECKS = 500
+
+    def __init__(self, db_path="plots.db", max_bytes=256 * 2**20):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.wal = not is_network_path(db_path)
+        self._orphan_cursors = {"plots": 0, "files": 0} # rowid of the next path to check
+        self._local = threading.local()
+        self._queue = queue.Queue() # ((sql, params), ...) written together, None to stop
+        self._pending = set() # (filepath, h) queued, not written yet
+        self._pending_lock = threading.Lock()
+
+        db = self._connect(self.WRITE_TIMEOUT_S)
+        self._createTables(db)
+        db.close()
+
+        self._writer = threading.Thread(target=self._writeLoop, name="DBPlots writer", daemon=True)
+        self._writer.start()
+
+    def _createTables(self, db):
+        # set before the first table, or by the VACUUM below for older dbs
+        db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        db.execute(f"PRAGMA journal_mode={'WAL' if self.wal else 'DELETE'}")
+        db.execute("""
             CREATE TABLE IF NOT EXISTS plots (
                 filepath TEXT,
                 file_content_hash TEXT,
                 image BLOB,
+                last_access REAL DEFAULT 0,
+                nbytes INTEGER DEFAULT 0,
                 PRIMARY KEY (filepath, file_content_hash)
             )
         """)
-        self.db.commit()
-
-    def add_fig(self, rfdata, fig):
-        # Check if an entry for this filepath already exists
-        self.cur.execute(
-            "SELECT file_content_hash FROM plots WHERE filepath = ?",
-            (rfdata.filepath,)
-        )
-        row = self.cur.fetchone()
-        if row:
-            existing_hash = row[0]
-            # Skip if file content hasn't changed
-            #if existing_hash == rfdata.h:
-            #    return existing_hash
-
-            # Otherwise, update the existing record
-            image_bytes = fig_to_bytes(fig)
-            self.cur.execute(
-                "UPDATE plots SET file_content_hash = ?, image = ? WHERE filepath = ?",
-                (rfdata.h, image_bytes, rfdata.filepath)
+        # dbs of previous versions
+        columns = [row[1] for row in db.execute("PRAGMA table_info(plots)")]
+        if "last_access" not in columns:
+            db.execute("ALTER TABLE plots ADD COLUMN last_access REAL DEFAULT 0")
+        if "nbytes" not in columns:
+            db.execute("ALTER TABLE plots ADD COLUMN nbytes INTEGER DEFAULT 0")
+            db.execute("UPDATE plots SET nbytes = length(image)")
+        db.execute("CREATE INDEX IF NOT EXISTS plots_last_access ON plots (last_access)")
+        columns = [row[1] for row in db.execute("PRAGMA table_info(files)")]
+        if columns and "id" not in columns:
+            # index of a previous version, without stable ids for `search`: crawled again
+            db.execute("DROP TABLE files")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                filepath TEXT UNIQUE,
+                size INTEGER,
+                mtime_ns INTEGER,
+                file_content_hash TEXT,
+                summary TEXT,
+                indexed_at REAL
             )
-        else:
-            # Insert new record
-            image_bytes = fig_to_bytes(fig)
-            self.cur.execute(
-                "INSERT INTO plots (filepath, file_content_hash, image) VALUES (?, ?, ?)",
-                (rfdata.filepath, rfdata.h, image_bytes)
+        """)
+        db.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+                {", ".join(self.SEARCH_COLUMNS)}, prefix='2 3'
             )
+        """)
+        if db.execute("PRAGMA user_version").fetchone()[0] < 1:
+            self._migratePaths(db)
+            db.execute("PRAGMA user_version = 1")
+        db.commit()
+        if db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            db.execute("VACUUM") # once, applies auto_vacuum=INCREMENTAL
+
+    def _migratePaths(self, db):
+        """ paths stored by previous versions, as given (native separator on Windows), to db_filepath """
+        for table, key in (("plots", "rowid"), ("files", "id")):
+            rows = [
+                (db_filepath(filepath), rowid)
+                for rowid, filepath in db.execute(f"SELECT {key}, filepath FROM {table}")
+                if db_filepath(filepath) != filepath
+            ]
+            db.executemany(f"UPDATE OR IGNORE {table} SET filepath = ? WHERE {key} = ?", rows)
+            # already there under the new form
+            stale = [(rowid,) for new, rowid in rows if db.execute(
+                f"SELECT 1 FROM {table} WHERE {key} = ? AND filepath != ?", (rowid, new)).fetchone()]
+            db.executemany(f"DELETE FROM {table} WHERE {key} = ?", stale)
+            if table == "files":
+                db.executemany("DELETE FROM search WHERE rowid = ?", stale)
+
+    def _connect(self, timeout) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, timeout=timeout)
+        if self.wal:
+            db.execute("PRAGMA synchronous=NORMAL") # enough with WAL, a crash loses the last thumbnails only
+        return db
+
+    def _reader(self) -> sqlite3.Connection:
+        """ connection of the current thread """
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect(self.READ_TIMEOUT_S)
+        return db
+
+    def _read(self, sql, params=()):
+        """ first row of `sql`, None if there is none or the db is locked """
+        try:
+            return self._reader().execute(sql, params).fetchone()
+        except sqlite3.OperationalError as e:
+            print("DBPlots read skipped:", e)
+            return None
+
+    def _readAll(self, sql, params=()) -> list:
+        """ rows of `sql`, [] if the db is locked """
+        try:
+            return self._reader().execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print("DBPlots read skipped:", e)
+            return []
+
+    def _write(self, *statements):
+        """ queue (sql, params) statements, written in order in one transaction by the writer thread """
+        self._queue.put(statements)
 
-        self.db.commit()
+    def _writeLoop(self):
+        db = self._connect(self.WRITE_TIMEOUT_S)
+        stop = False
+        last_maintenance = time.monotonic()
+        while not stop:
+            if time.monotonic() - last_maintenance > self.MAINTENANCE_S:
+                last_maintenance = time.monotonic()
+                try:
+                    self._maintain(db)
+                except sqlite3.Error as e:
+                    print("DBPlots maintenance skipped:", e)
+            try:
+                batch = [self._queue.get(timeout=self.MAINTENANCE_S)]
+            except queue.Empty:
+                continue
+            # wait a little for more, to write them in one transaction
+            while len(batch) < self.WRITE_BATCH and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=self.WRITE_DELAY_S))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                stop = True
+                batch.pop()
+            try:
+                with db:
+                    for statements in batch:
+                        for sql, params in statements:
+                            db.execute(sql, params)
+            except sqlite3.Error as e:
+                print(f"DBPlots: {len(batch)} writes lost:", e)
+            finally:
+                with self._pending_lock:
+                    if self._queue.empty():
+                        self._pending.clear()
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+        db.close()
+
+    def _maintain(self, db):
+        """ evict to max_bytes and orphans, then compact. In the writer thread. """
+        with db:
+            # least recently viewed first
+            total = db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM plots").fetchone()[0]
+            excess = total - self.max_bytes
+            if excess > 0:
+                rowids = []
+                for rowid, nbytes in db.execute("SELECT rowid, nbytes FROM plots ORDER BY last_access"):
+                    if excess <= 0:
+                        break
+                    rowids.append((rowid,))
+                    excess -= nbytes
+                db.executemany("DELETE FROM plots WHERE rowid = ?", rowids)
+
+            for table in self._orphan_cursors:
+                self._dropOrphans(db, table)
+
+        # executescript: run to completion, execute() would free a single page
+        db.executescript("PRAGMA incremental_vacuum;")
+        if self.wal:
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _dropOrphans(self, db, table):
+        """ delete the rows of deleted files, a slice of the paths per pass whatever the size of the archive """
+        rows = db.execute(
+            f"SELECT rowid, filepath FROM {table} WHERE rowid >= ? ORDER BY rowid LIMIT ?",
+            (self._orphan_cursors[table], self.ORPHAN_CHECKS)
+        ).fetchall()
+        self._orphan_cursors[table] = rows[-1][0] + 1 if len(rows) == self.ORPHAN_CHECKS else 0
+        orphans = [
+            (rowid,) for rowid, filepath in rows
+            # a missing directory can be an unmounted drive, not a deleted file
+            if not os.path.exists(filepath) and os.path.isdir(os.path.dirname(filepath))
+        ]
+        db.executemany(f"DELETE FROM {table} WHERE rowid = ?", orphans)
+        if table == "files":
+            db.executemany("DELETE FROM search WHERE rowid = ?", orphans)
+
+    def has_fig(self, filepath: str, h: str) -> bool:
+        """ True if the thumbnail of this content of filepath is stored (or queued) """
+        filepath = db_filepath(filepath)
+        with self._pending_lock:
+            if (filepath, h) in self._pending:
+                return True
+        return self._read(
+            "SELECT 1 FROM plots WHERE filepath = ? AND file_content_hash = ?",
+            (filepath, h)
+        ) is not None
+
+    def add_fig(self, filepath: str, h: str, image_bytes: bytes):
+        """ queued: one thumbnail per filepath, replaced only if the content hash changed """
+        filepath = db_filepath(filepath)
+        with self._pending_lock:
+            self._pending.add((filepath, h))
+        self._write(
+            ("DELETE FROM plots WHERE filepath = ? AND file_content_hash != ?", (filepath, h)),
+            ("INSERT OR IGNORE INTO plots (filepath, file_content_hash, image, last_access, nbytes) VALUES (?, ?, ?, ?, ?)",
+                (filepath, h, image_bytes, time.time(), len(image_bytes))),
+        )
 
     def get_fig(self, filepath: str):
-        self.cur.execute(
+        filepath = db_filepath(filepath)
+        row = self._read(
             "SELECT image FROM plots WHERE filepath=?",
             (filepath, )
         )
-        row = self.cur.fetchone()
+        if row:
+            # for the eviction, queued like the writes
+            self._write(("UPDATE plots SET last_access = ? WHERE filepath = ?", (time.time(), filepath)))
         return row[0] if row else None
 
+    def file_state(self, filepath: str):
+        """ (size, mtime_ns, file_content_hash) of the last indexing of filepath, None if never indexed """
+        filepath = db_filepath(filepath)
+        return self._read(
+            "SELECT size, mtime_ns, file_content_hash FROM files WHERE filepath = ?",
+            (filepath, )
+        )
+
+    def add_file(self, filepath: str, size: int, mtime_ns: int, h, summary, search=None):
+        """ queued: index entry of filepath. summary: json text, None keeps the previous one.
+        search: {column: text} of SEARCH_COLUMNS, None keeps the previous one.
+        """
+        filepath = db_filepath(filepath)
+        statements = [(
+            """INSERT INTO files (filepath, size, mtime_ns, file_content_hash, summary, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (filepath) DO UPDATE SET
+                    size = excluded.size, mtime_ns = excluded.mtime_ns,
+                    file_content_hash = excluded.file_content_hash,
+                    summary = COALESCE(excluded.summary, files.summary),
+                    indexed_at = excluded.indexed_at""",
+            (filepath, size, mtime_ns, h, summary, time.time())
+        )]
+        if search is not None:
+            file_id = "(SELECT id FROM files WHERE filepath = ?)"
+            statements += [
+                (f"DELETE FROM search WHERE rowid = {file_id}", (filepath,)),
+                (f"INSERT INTO search (rowid, {', '.join(self.SEARCH_COLUMNS)}) "
+                    f"VALUES ({file_id}, {', '.join('?' * len(self.SEARCH_COLUMNS))})",
+                    (filepath, *(search.get(column, "") for column in self.SEARCH_COLUMNS))),
+            ]
+        self._write(*statements)
+
+    def search(self, text: str, limit=None, root=None) -> list:
+        """ paths of the indexed files matching `text`, best first. [] on a malformed query.
+        Every word must match, as a prefix; `column:word` restricts a word to a column
+        of SEARCH_COLUMNS (ex: `axes:B dims:2d`).
+        root: only the files under this directory, filtered before the limit.
+        """
+        query = fts_query(text, self.SEARCH_COLUMNS)
+        if not query:
+            return []
+        # under root: between "<root>/" and "<root>0" ('0' follows '/')
+        prefix = "" if root is None else db_filepath(root).rstrip("/") + "/"
+        rows = self._readAll(
+            """SELECT files.filepath FROM search JOIN files ON files.id = search.rowid
+                WHERE search MATCH ? AND (? = '' OR files.filepath >= ? AND files.filepath < ?)
+                ORDER BY search.rank LIMIT ?""",
+            (query, prefix, prefix, prefix[:-1] + "0", limit or self.SEARCH_LIMIT)
+        )
+        return [row[0] for row in rows]
+
+    def flush(self):
+        """ wait until every queued write is done """
+        self._queue.join()
+
     def close(self):
-        self.db.close()
\ No newline at end of file
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+def db_filepath(filepath) -> str:
+    """ stored form of a path: normalized, '/' separated, case folded where the file system ignores it """
+    return os.path.normcase(os.path.normpath(filepath)).replace(os.sep, "/")
+
+
+NETWORK_FILE_SYSTEMS = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "9p", "afs", "fuse.sshfs", "davfs", "ceph", "glusterfs"}
+
+def is_network_path(path) -> bool:
+    """ True if `path` is on a network share: UNC path or network drive on Windows,
+    network file system mount (/proc/mounts) on Linux. False if unknown.
+    """
+    path = os.path.abspath(path)
+    if os.name == "nt":
+        if path.startswith("\\\\"):
+            return True
+        import ctypes
+        DRIVE_REMOTE = 4
+        drive = os.path.splitdrive(path)[0] + "\\"
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == DRIVE_REMOTE
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    path = os.path.realpath(path)
+    fs_type, longest = None, -1
+    for mount_point, mount_fs in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if len(mount_point) > longest and (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")):
+            fs_type, longest = mount_fs, len(mount_point)
+    return fs_type in NETWORK_FILE_SYSTEMS
+
+
+def fts_query(text: str, columns=()) -> str:
+    """ fts5 query of the words of `text`: all required, prefix match, quoted
+    (no fts5 syntax error on user input). `column:word` is kept as a column filter.
+    """
+    terms = []
+    for word in text.split():
+        column, sep, value = word.partition(":")
+        if sep and column in columns and value:
+            word = value
+        else:
+            column = None
+        term = '"' + word.replace('"', '""') + '"*'
+        terms.append(f"{column} : {term}" if column else term)
+    return " AND ".join(terms)
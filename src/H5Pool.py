@@ -0,0 +1,129 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import h5py
+
+
+class H5Handle:
+    __slots__ = ("file", "stat_key", "checked", "users", "last_used")
+
+    def __init__(self, file, stat_key):
+        self.file = file
+        self.stat_key = stat_key # (size, mtime_ns) when opened
+        self.checked = time.monotonic() # last time stat_key was checked against the file
+        self.users = 0
+        self.last_used = self.checked
+
+
+class H5Pool:
+    """
+    Bounded pool of opened hdf5 files (read only, SWMR), shared by the loaders,
+    the preview and the file tree menu, so a click opens the file once.
+
+        with H5_POOL.open(filepath) as file:
+            file["data"]...
+
+    A handle is reused while the file size and mtime are unchanged, else it is reopened.
+    The stat is done at most every `check_s`, in between the handle is trusted.
+    Least recently used handles are closed above `max_files`, idle ones
+    after `idle_s` (closeIdle) so writers are not kept waiting on the file lock.
+    A handle in use is never closed.
+
+    rdcc_nbytes, rdcc_nslots, rdcc_w0: hdf5 chunk cache of every opened file,
+    see h5py.File.
+    """
+
+    def __init__(self, max_files=8, idle_s=30, check_s=1.0,
+                 rdcc_nbytes=2**25, rdcc_nslots=10007, rdcc_w0=0.75):
+        self.max_files = max_files
+        self.idle_s = idle_s
+        self.check_s = check_s
+        self.rdcc = dict(rdcc_nbytes=rdcc_nbytes, rdcc_nslots=rdcc_nslots, rdcc_w0=rdcc_w0)
+        self._handles = OrderedDict() # filepath -> H5Handle
+        self._stale = [] # replaced handles still in use, closed on release
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def open(self, filepath):
+        handle = self._acquire(filepath)
+        try:
+            yield handle.file
+        finally:
+            self._release(handle)
+
+    def stat_key(self, filepath):
+        """ (size, mtime_ns) of `filepath` as seen by its pooled handle """
+        with self._lock:
+            handle = self._handles.get(filepath)
+            if handle is not None:
+                return handle.stat_key
+        st = os.stat(filepath)
+        return (st.st_size, st.st_mtime_ns)
+
+    def _acquire(self, filepath) -> H5Handle:
+        with self._lock:
+            now = time.monotonic()
+            handle = self._handles.get(filepath)
+            if handle is not None and now - handle.checked > self.check_s:
+                st = os.stat(filepath)
+                if (st.st_size, st.st_mtime_ns) != handle.stat_key:
+                    self._drop(filepath)
+                    handle = None
+                else:
+                    handle.checked = now
+
+            if handle is None:
+                st = os.stat(filepath)
+                file = h5py.File(filepath, "r", swmr=True, **self.rdcc)
+                handle = self._handles[filepath] = H5Handle(file, (st.st_size, st.st_mtime_ns))
+
+            self._handles.move_to_end(filepath)
+            handle.users += 1
+            handle.last_used = now
+            self._evict()
+            return handle
+
+    def _release(self, handle: H5Handle):
+        with self._lock:
+            handle.users -= 1
+            handle.last_used = time.monotonic()
+            if handle.users == 0 and handle in self._stale:
+                self._stale.remove(handle)
+                handle.file.close()
+            self._evict()
+
+    def _drop(self, filepath):
+        handle = self._handles.pop(filepath)
+        if handle.users:
+            self._stale.append(handle)
+        else:
+            handle.file.close()
+
+    def _evict(self):
+        idle = [path for path, handle in self._handles.items() if handle.users == 0]
+        for path in idle[:max(0, len(self._handles) - self.max_files)]:
+            self._drop(path)
+
+    def invalidate(self, filepath):
+        """ close the handle of `filepath`, the next open() reopens it """
+        with self._lock:
+            if filepath in self._handles:
+                self._drop(filepath)
+
+    def closeIdle(self):
+        """ close the handles unused for more than idle_s """
+        with self._lock:
+            now = time.monotonic()
+            for path in [p for p, h in self._handles.items() if h.users == 0 and now - h.last_used > self.idle_s]:
+                self._drop(path)
+
+    def closeAll(self):
+        with self._lock:
+            for path in list(self._handles):
+                self._drop(path)
+
+
+H5_POOL = H5Pool()
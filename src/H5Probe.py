@@ -0,0 +1,146 @@
+import os
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from src.QuickThread import QuickThread
+from src.H5Pool import H5_POOL
+from src.ReadfileData import SUPPORTED_HDF5_VERSIONS_WITH_RESULTS
+
+
+class AxisInfo(NamedTuple):
+    name: str
+    length: int
+    dtype: str
+
+class ResultInfo(NamedTuple):
+    name: str
+    shape: tuple
+    dtype: str
+    axes: tuple # names of the swept axes
+    res_type: Optional[str]
+
+class GroupInfo(NamedTuple):
+    name: str
+    axes: tuple # AxisInfo
+    results: tuple # ResultInfo
+
+class H5Summary(NamedTuple):
+    """ Structure of an hdf5 file, what the file tree and its preview show """
+    version: Optional[str]
+    stat_key: tuple # (size, mtime_ns) of the probed file
+    groups: tuple = () # GroupInfo of the `results` section, () if none or unsupported version
+
+    @property
+    def has_results(self) -> bool:
+        return bool(self.groups)
+
+
+def h5_probe(filepath) -> H5Summary:
+    """ H5Summary of an hdf5 file, attributes and shapes only, no data is read """
+    with H5_POOL.open(filepath) as file:
+        stat_key = H5_POOL.stat_key(filepath) # of the opened handle
+        meta = file.get("meta")
+        version = str(meta.attrs.get("VERSION")) if meta is not None else None
+        if version not in SUPPORTED_HDF5_VERSIONS_WITH_RESULTS or "results" not in file:
+            return H5Summary(version, stat_key)
+
+        groups = []
+        for group_name, group in file["results"].items():
+            axes = []
+            for ax_name in group.attrs["sweeped_ax_names"]:
+                ax = group[ax_name]
+                axes.append(AxisInfo(ax_name, len(ax), str(ax.dtype)))
+            results = []
+            for data_name in group.attrs["result_data_names"]:
+                data = group[data_name]
+                res_type = data.attrs.get("res_type", None)
+                results.append(ResultInfo(
+                    data_name, data.shape, str(data.dtype),
+                    tuple(data.attrs.get("axes", ())),
+                    None if res_type is None else str(res_type),
+                ))
+            groups.append(GroupInfo(group_name, tuple(axes), tuple(results)))
+        return H5Summary(version, stat_key, tuple(groups))
+
+
+class H5Probe(QObject):
+    """
+    Probes hdf5 files structure (h5_probe) in a QuickThread, one at a time,
+    last requested first. Summaries are cached by path and checked against the
+    file size and mtime on the next request.
+
+    The gui reads `cached(path)`, which never touches the file, and
+    gets sig_probed when a new or changed summary is available.
+    """
+
+    sig_probed = pyqtSignal(str, object) # filepath, H5Summary
+
+    MAX_PENDING = 16 # older requests are dropped, the user has moved on
+
+    def __init__(self, max_files=512):
+        super().__init__()
+        self.max_files = max_files
+        self._summaries = OrderedDict() # filepath -> H5Summary
+        self.pending = [] # stack of filepaths, last is next
+        self.running = None
+        self.thread = None
+
+    def cached(self, filepath) -> Optional[H5Summary]:
+        summary = self._summaries.get(filepath)
+        if summary is not None:
+            self._summaries.move_to_end(filepath)
+        return summary
+
+    def request(self, filepath):
+        if filepath == self.running:
+            return
+        if filepath in self.pending:
+            self.pending.remove(filepath)
+        self.pending.append(filepath)
+        del self.pending[:-self.MAX_PENDING]
+        self._next()
+
+    def _next(self):
+        if self.running is None and self.pending:
+            if self.thread is not None:
+                self.thread.wait()
+            filepath = self.running = self.pending.pop()
+            self.thread = QuickThread(probe_if_changed, filepath, self._summaries.get(filepath))
+            self.thread.sig_finished.connect(self._onProbed)
+            self.thread.sig_error.connect(self._onError)
+            self.thread.start()
+
+    def _store(self, filepath, summary):
+        self._summaries[filepath] = summary
+        self._summaries.move_to_end(filepath)
+        while len(self._summaries) > self.max_files:
+            self._summaries.popitem(last=False)
+
+    # slots of the QuickThread signals, in the gui thread
+    def _onProbed(self, summary, fn_args, fn_kwargs):
+        filepath, previous = fn_args
+        self.running = None
+        if summary is not previous:
+            self._store(filepath, summary)
+            self.sig_probed.emit(filepath, summary)
+        self._next()
+
+    def _onError(self, exception, fn_args, fn_kwargs):
+        self.running = None
+        print("Could not probe", fn_args[0], exception)
+        self._next()
+
+    def shutdown(self):
+        self.pending = []
+        if self.thread is not None:
+            self.thread.wait()
+
+
+def probe_if_changed(filepath, previous: Optional[H5Summary]) -> H5Summary:
+    """ `previous` if the file did not change since, else a new h5_probe """
+    st = os.stat(filepath)
+    if previous is not None and previous.stat_key == (st.st_size, st.st_mtime_ns):
+        return previous
+    return h5_probe(filepath)
@@ -0,0 +1,106 @@
+import json
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from src.QuickThread import QuickThread
+from src.ReadfileData import LoadTask, LoadCancelled
+
+
+class LoadRequest:
+    __slots__ = ("path", "loading_kwargs", "new_tab", "key", "task", "partial")
+
+    def __init__(self, path, loading_kwargs, new_tab):
+        self.path = path
+        self.loading_kwargs = loading_kwargs
+        self.new_tab = new_tab
+        self.key = (path, json.dumps(loading_kwargs, sort_keys=True, default=str))
+        self.task = LoadTask()
+        self.partial = None # rfdata_list shown before the full one, see sig_partial
+
+
+class LoadScheduler(QObject):
+    """
+    Runs the file loads one at a time, most recent request first (LIFO).
+
+    - a request identical (path, loading_kwargs) to a pending or running one is ignored
+    - a request for the current tab supersedes the older current tab ones:
+      pending ones are dropped, the running one is cancelled (its loader stops
+      at the next chunk, see LoadTask) and its result is never emitted
+    - new tab requests are never superseded
+
+    load_function(path, loading_kwargs, task) -> result, run in a QuickThread.
+    Its progress and partial result (LoadTask) are forwarded as sig_progress/sig_partial.
+    """
+
+    sig_loaded = pyqtSignal(object, object) # result, LoadRequest
+    sig_error = pyqtSignal(object, object) # exception, LoadRequest
+    sig_queueChanged = pyqtSignal(int) # number of pending + running requests
+    sig_progress = pyqtSignal(float, object) # fraction, LoadRequest
+    sig_partial = pyqtSignal(object, object) # partial result, LoadRequest
+
+    def __init__(self, load_function):
+        super().__init__()
+        self.load_function = load_function
+        self.pending = [] # stack, last is next
+        self.running = None # LoadRequest
+        self.thread = None
+
+    def request(self, path, loading_kwargs={}, new_tab=False):
+        request = LoadRequest(path, loading_kwargs, new_tab)
+        active = [self.running] if self.running and not self.running.task.cancelled else []
+        for other in active + self.pending:
+            if other.key == request.key:
+                # already asked, just make it the next one
+                other.new_tab = other.new_tab or new_tab
+                if other in self.pending:
+                    self.pending.remove(other)
+                    self.pending.append(other)
+                return
+
+        request.task.on_progress = lambda fraction: self.sig_progress.emit(fraction, request)
+        request.task.on_partial = lambda result: self.sig_partial.emit(result, request)
+
+        if not new_tab:
+            self.pending = [other for other in self.pending if other.new_tab]
+            for other in active:
+                if not other.new_tab:
+                    other.task.cancel()
+        self.pending.append(request)
+        self._next()
+
+    def cancelAll(self):
+        self.pending = []
+        if self.running:
+            self.running.task.cancel()
+        self.sig_queueChanged.emit(self.depth())
+
+    def depth(self) -> int:
+        return len(self.pending) + (self.running is not None)
+
+    def _next(self):
+        if self.running is None and self.pending:
+            if self.thread is not None:
+                # the previous one has emitted, let it return before dropping it
+                self.thread.wait()
+            request = self.running = self.pending.pop()
+            self.thread = QuickThread(self.load_function, request.path, request.loading_kwargs, request.task)
+            self.thread.sig_finished.connect(self._onLoaded)
+            self.thread.sig_error.connect(self._onError)
+            self.thread.start()
+        self.sig_queueChanged.emit(self.depth())
+
+    # slots of the QuickThread signals, in the gui thread
+    def _onLoaded(self, result, fn_args, fn_kwargs):
+        self._onFinished(result, None)
+
+    def _onError(self, exception, fn_args, fn_kwargs):
+        self._onFinished(None, exception)
+
+    def _onFinished(self, result, exception):
+        request, self.running = self.running, None
+        if not request.task.cancelled:
+            if exception is None:
+                self.sig_loaded.emit(result, request)
+            elif not isinstance(exception, LoadCancelled):
+                self.sig_error.emit(exception, request)
+        self._next()
@@ -0,0 +1,135 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+import numpy as np
+
+
+class ParseCache:
+    """
+    On disk cache of parsed pyHegel files, so reopening a file is a memory map, not a parse.
+
+    An entry is the PhTailReader state of a file (its parsed columns and header),
+    from which the data_dict is rebuilt. Entries are keyed by the content
+    fingerprint (rfdata.h) and stored as:
+        <cache_dir>/<h>/columns.npy  # (ncols, nrows) float array, loaded memory mapped
+        <cache_dir>/<h>/state.json   # titles, headers, offsets...
+    <cache_dir>/paths/ keeps the last (size, mtime, h) of every cached path,
+    to find the entry of an unchanged file without hashing it.
+
+    The total size is bounded by `max_bytes`, least recently used entries are removed first.
+    """
+
+    VERSION = 1 # change when the state format changes
+    MIN_FILE_BYTES = 2**20 # smaller files are faster to parse than to cache
+
+    def __init__(self, cache_dir, max_bytes=4 * 2**30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(cache_dir, "paths"), exist_ok=True)
+
+    def _pathIndexFile(self, filepath):
+        name = hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest()
+        return os.path.join(self.cache_dir, "paths", name + ".json")
+
+    def fingerprint(self, filepath, metadata: os.stat_result):
+        """ fingerprint of the last cached content of `filepath`, None if the file changed since """
+        try:
+            with open(self._pathIndexFile(filepath), "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (index["size"], index["mtime_ns"]) != (metadata.st_size, metadata.st_mtime_ns):
+            return None
+        return index["h"]
+
+    def load(self, h):
+        """ state of the entry `h`, with the columns memory mapped, None if not cached """
+        if h is None:
+            return None
+        entry = os.path.join(self.cache_dir, h)
+        try:
+            with open(os.path.join(entry, "state.json"), "r") as f:
+                state = json.load(f)
+            if state.pop("version", None) != self.VERSION:
+                return None
+            # copy on write: the columns can be extended in place on reload
+            state["columns"] = np.load(os.path.join(entry, "columns.npy"), mmap_mode="c")
+            os.utime(entry) # last access, for eviction
+        except (OSError, ValueError):
+            return None
+        return state
+
+    def save(self, filepath, metadata: os.stat_result, h, state: dict):
+        """ best effort: an error (disk full, read only cache...) is printed, the load goes on """
+        if metadata.st_size < self.MIN_FILE_BYTES:
+            return
+        try:
+            self._save(filepath, metadata, h, state)
+            self.evict()
+        except OSError as e:
+            print("ParseCache: could not save", filepath, e)
+
+    def _save(self, filepath, metadata: os.stat_result, h, state: dict):
+        entry = os.path.join(self.cache_dir, h)
+        suffix = f".tmp{os.getpid()}.{threading.get_ident()}"
+        if not self._complete(entry):
+            # partly removed (a memory mapped columns.npy survives rmtree on Windows)
+            shutil.rmtree(entry, ignore_errors=True)
+            tmp = entry + suffix
+            os.makedirs(tmp, exist_ok=True)
+            state = dict(state, version=self.VERSION)
+            try:
+                np.save(os.path.join(tmp, "columns.npy"), state.pop("columns"))
+                with open(os.path.join(tmp, "state.json"), "w") as f:
+                    json.dump(state, f)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                # saved by another thread/instance meanwhile, or the incomplete
+                # entry is still mapped: saved again next time
+                shutil.rmtree(tmp, ignore_errors=True)
+
+        index_file = self._pathIndexFile(filepath)
+        with open(index_file + suffix, "w") as f:
+            json.dump({
+                "path": filepath,
+                "size": metadata.st_size,
+                "mtime_ns": metadata.st_mtime_ns,
+                "h": h
+            }, f)
+        os.replace(index_file + suffix, index_file)
+
+    @staticmethod
+    def _complete(entry) -> bool:
+        """ state.json is written last, see _save """
+        return os.path.isfile(os.path.join(entry, "state.json"))
+
+    def evict(self):
+        """ remove incomplete entries, then least recently used ones until the cache fits in max_bytes """
+        with self._lock:
+            entries = []
+            for item in os.scandir(self.cache_dir):
+                if not item.is_dir() or item.name == "paths" or ".tmp" in item.name:
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(item.path))
+                    last_access = item.stat().st_mtime
+                except OSError:
+                    continue # removed meanwhile
+                if not self._complete(item.path):
+                    shutil.rmtree(item.path, ignore_errors=True)
+                    continue
+                entries.append((last_access, size, item.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
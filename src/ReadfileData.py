@@ -1,31 +1,12 @@
 import pyHegel.commands as c
-import os, sys, hashlib
+import os, sys, hashlib, io, mmap, time
+import threading, tempfile
+from contextlib import contextmanager
 import h5py
 import numpy as np
-from copy import copy, deepcopy
-
-DATA_DICT_FORMAT = {
-    'x': {
-        'range': [-1,1,6,0.2], 
-        'title': 'random_x', 
-        'data': np.zeros((11,6))},
-    'y': {
-        'range': [0,2,11,0.1], 
-        'title': 'random_y', 
-        'data': np.zeros((11,6))
-    },
-    'out': {
-        'titles': ['out1', 'out2'],
-        'data': [np.random.rand(11,6), np.random.rand(11,6)]
-    },
-    # 'computed_out': {'titles': [], 'data': []}, # for computed data (r, deg, x, y)
-    'alternate': False,
-    'beforewait': True,
-    'sweep_dim': 2,
-    'config': [],
-    'meta': [],
-    'sweep_time': None # epoch [beginning, end]
-    }
+from collections import OrderedDict
+from src.SweepData import SweepData, Axis, Outs, Range
+from src.H5Pool import H5_POOL
 
 PLOT_DICT_1D_FORMAT = {
     "x_title": "",
@@ -47,8 +28,47 @@ PLOT_DICT_2D_FORMAT = {
 SUPPORTED_HDF5_VERSIONS = ("0.1", "0.2", "0.3", "0.4", "0.5")
 SUPPORTED_HDF5_VERSIONS_WITH_RESULTS = SUPPORTED_HDF5_VERSIONS[3:]
 
+# progressive loading: files bigger than that are first shown partially
+PROGRESSIVE_MIN_BYTES = 2**25
+HEAD_BYTES = 2**22 # first lines parsed for the partial pyHegel view
+
+
+class LoadCancelled(Exception):
+    """ raised by a loader when its LoadTask was cancelled """
+
+class LoadTask:
+    """ Handle on a running load, given to the loaders (from_filepath(task=...)).
+    Loaders call check() between chunks, a cancelled load stops there.
+    They report their progress (fraction of the file) and, for big files,
+    a partial result to show before the full one (progressive loading).
+
+    on_progress(fraction), on_partial(rfdata_list): called from the loading thread.
+    """
+
+    def __init__(self, on_progress=None, on_partial=None):
+        self.cancelled = False
+        self.on_progress = on_progress
+        self.on_partial = on_partial
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise LoadCancelled()
+
+    def progress(self, fraction):
+        if self.on_progress is not None:
+            self.on_progress(fraction)
+
+    def partial(self, rfdata_list):
+        if self.on_partial is not None and rfdata_list and not self.cancelled:
+            self.on_partial(rfdata_list)
+
 class ReadfileData:
 
+    DATA_CACHE_SIZE = 4 # arrays kept by get_data
+
     def __init__(self, filepath, metadata, h, data_dict, reload_function, reload_function_index):
         self.h = h
         self.metadata = metadata
@@ -58,44 +78,119 @@ class ReadfileData:
         self.plot_dict = None # used to store current plotted (filtered) data
         self.reload_function = reload_function # for reloading the data_dict
         self.reload_function_index = reload_function_index # reload_function returns a list of data_dict. This is the index to take
+        self._data_cache = OrderedDict() # (title, alternate) -> array, see get_data
     
     def reload(self):
-        self.data_dict = self.reload_function()[self.reload_function_index]
+        return self.swap(*self.load_next())
+
+    def load_next(self, preload=()) -> tuple:
+        """ (file stat, reloaded data_dict), not shown yet (see swap). Can run on a worker thread:
+        the current data_dict stays valid while the next one is built.
+        preload: titles of followed hdf5 channels read now (on the worker), see shown_titles.
+        """
+        metadata = os.stat(self.filepath) # before reading: a write during the reload is a change
+        if isinstance(self.reload_function, H5LiveReader):
+            # the other data_dicts of the file are not rebuilt
+            data_dict = self.reload_function(self.reload_function_index)[self.reload_function_index]
+        else:
+            data_dict = self.reload_function()[self.reload_function_index]
+        for title in preload:
+            if title in data_dict.out and isinstance(data := data_dict.out[title], H5LiveDataset):
+                data.read()
+        return metadata, data_dict
+
+    def shown_titles(self) -> list:
+        """ titles read by get_data since the last swap """
+        return list(dict.fromkeys(key[0] for key in self._data_cache))
+
+    def swap(self, metadata: os.stat_result, data_dict: SweepData):
+        """ show `data_dict` (from load_next) instead of the current one, in the gui thread """
+        H5_CHANNEL_CACHE.invalidate(self.filepath)
+        self.metadata = metadata
+        slab = self.data_dict.slab
+        self.data_dict = data_dict
+        if len(slab) == len(self.data_dict.extra_axes):
+            self.data_dict.slab = slab
+        self._data_cache.clear()
         return self
+
+    def file_changed(self) -> bool:
+        """ cheap check (size, mtime) that the file changed since the data_dict was read """
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns) != (self.metadata.st_size, self.metadata.st_mtime_ns)
+
+    def close(self):
+        """ release what the reload_function keeps opened (followed hdf5 file) """
+        if (close := getattr(self.reload_function, "close", None)) is not None:
+            close()
             
     def get_data(self, title, alternate=False, transpose=False):
+        """ read only array of `title`, oriented for display.
+        The (serpentine corrected) array is computed once per (title, alternate)
+        and kept until reload, orientation is a view of it.
+        For N-d sweeps, it is the slab selected with set_slab.
+        """
+        key = (title, alternate, self.data_dict.slab)
+        data = self._data_cache.get(key)
+        if data is None:
+            data = self._computeData(title, alternate)
+            self._data_cache[key] = data
+            while len(self._data_cache) > self.DATA_CACHE_SIZE:
+                self._data_cache.popitem(last=False)
+        else:
+            self._data_cache.move_to_end(key)
+
+        if self.data_dict.sweep_dim == 2:
+            # transpose by default
+            data = data if transpose else data.T
+        return readonly_view(data)
+
+    def set_slab(self, slab):
+        """ indices on extra_axes of the slab returned by get_data (N-d sweeps).
+        Arrays of the previous slab are dropped, one slab at a time stays in memory.
+        """
+        slab = tuple(int(i) for i in slab)
+        if slab != self.data_dict.slab:
+            self.data_dict.slab = slab
+            self._data_cache.clear()
+
+    def _computeData(self, title, alternate=False):
         # get the data array corresponding to the title
         # search in the out titles and data
-        if title in self.data_dict['out']['titles']:
-            i = self.data_dict['out']['titles'].index(title)
-            data_cp_shallow = copy(self.data_dict['out']['data'][i])
+        if title in self.data_dict.out:
+            data = self.data_dict.out[title]
+            if self.data_dict.extra_axes:
+                # N-d: only the displayed slab is read (H5SlabDataset)
+                data_cp_shallow = data.read_slab(self.data_dict.slab)
+            else:
+                # no copy: memmap stays on disk, lazy h5 channels (H5LazyDataset) are read here
+                data_cp_shallow = np.asarray(data)
         # search in the computed_out titles and data
         #elif title in self.data_dict['computed_out']['titles']:
         #    i = self.data_dict['computed_out']['titles'].index(title)
         #    data_cp = deepcopy(self.data_dict['computed_out']['data'][i])
         else:
-            print("error on get_data ", self.data_dict['out']['titles'])
+            print("error on get_data ", self.data_dict.out.titles)
             raise KeyError()
-        if self.data_dict['sweep_dim'] == 1:
-            return data_cp_shallow
-        if self.data_dict['sweep_dim'] == 2:
+        if self.data_dict.sweep_dim == 2 and alternate:
             # alternate data if needed
-            if alternate:
-                start, stop, npts = self.data_dict['x']['range'][0:3]
-                to_flip = slice(1, None, 2) # odd rows by default
-
-                if start > stop and npts%2 == 0:
-                    # flip even rows if sweep is in reverse with an even numbers of point
-                    to_flip = slice(0, None, 2)
-                data_cp_shallow[to_flip] = data_cp_shallow[to_flip, ::-1]
-            if transpose:
-                data_cp_shallow = data_cp_shallow.T
-            # transpose by default
-            return data_cp_shallow.T
+            start, stop, npts = self.data_dict.x.range[0:3]
+            to_flip = slice(1, None, 2) # odd rows by default
+
+            if start > stop and npts%2 == 0:
+                # flip even rows if sweep is in reverse with an even numbers of point
+                to_flip = slice(0, None, 2)
+            # flip into its own buffer, the source can be read only or shared
+            data_cp_shallow = np.array(data_cp_shallow)
+            data_cp_shallow[to_flip] = data_cp_shallow[to_flip, ::-1]
+        return data_cp_shallow
     
     def get_extent(self, transpose=False):
-        x_start, x_stop, x_nbpts, x_step = self.data_dict['x']['range']
-        y_start, y_stop, y_nbpts, y_step = self.data_dict['y']['range']
+        x_start, x_stop, x_nbpts, x_step = self.data_dict.x.range
+        y_start, y_stop, y_nbpts, y_step = self.data_dict.y.range
         # extent = (x_start, x_stop, y_start, y_stop)
         extent = (
             min(x_start, x_stop)-abs(x_step)/2, 
@@ -108,13 +203,75 @@ class ReadfileData:
         return extent
     
     def get_time_taken(self) -> str:
-        sweep_time = self.data_dict["sweep_time"]
+        sweep_time = self.data_dict.sweep_time
         if sweep_time is None:
             return ""
         if np.isnan(sweep_time).any():
             return ""
         return c.util.format_time(sweep_time[1] - sweep_time[0])
 
+    def default_plot_dict(self) -> dict:
+        """ plot_dict of what the views show first (SweepTreeView defaults):
+        out[0] vs out[1] in 1d, out[0] in 2d, first slab of N-d sweeps.
+        To draw without the views (thumbnails).
+        """
+        d = self.data_dict
+        titles = d.out.titles
+        if d.sweep_dim == 1:
+            x_title, y_title = titles[0], titles[min(1, len(titles) - 1)]
+            plot_dict = dict(PLOT_DICT_1D_FORMAT)
+            plot_dict.update({
+                "x_title": x_title,
+                "y_title": y_title,
+                "x_data": self.get_data(x_title),
+                "y_data": self.get_data(y_title),
+            })
+        else:
+            plot_dict = dict(PLOT_DICT_2D_FORMAT)
+            plot_dict.update({
+                "img": self.get_data(titles[0]),
+                "x_title": d.x.title,
+                "y_title": d.y.title,
+                "z_title": titles[0],
+                "cmap": "viridis",
+                "extent": self.get_extent(),
+            })
+        return plot_dict
+
+    def summary(self) -> dict:
+        """ json-able description of the data_dict (no data), see Crawler """
+        d = self.data_dict
+        axes = [d.x] if d.sweep_dim == 1 else [d.x, d.y, *d.extra_axes]
+        sweep_time = d.sweep_time
+        if sweep_time is not None:
+            sweep_time = [None if np.isnan(t) else float(t) for t in np.atleast_1d(sweep_time)]
+        return {
+            "sweep_dim": d.sweep_dim,
+            "shape": [int(axis.range.nbpts) for axis in axes],
+            "axes": {axis.title: [float(v) for v in axis.range] for axis in axes},
+            "titles": list(d.out.titles),
+            "sweep_time": sweep_time,
+        }
+
+    def search_text(self) -> dict:
+        """ text of the search index columns (DBPlots.search): headers, axes and their ranges,
+        out titles, dimensions, date of the sweep
+        """
+        summary = self.summary()
+        axes = " ".join(
+            f"{title} {start:g} {stop:g} {nbpts:g}"
+            for title, (start, stop, nbpts, step) in summary["axes"].items()
+        )
+        sweep_time = summary["sweep_time"] or [None]
+        timestamp = sweep_time[0] if sweep_time[0] is not None else self.metadata.st_mtime
+        return {
+            "header": "\n".join([header_text(self.data_dict.config), header_text(self.data_dict.meta)]),
+            "axes": axes,
+            "titles": " ".join(summary["titles"]),
+            "dims": f"{len(summary['shape'])}d " + "x".join(str(n) for n in summary["shape"]),
+            "date": time.strftime("%Y-%m-%d %A %B", time.localtime(timestamp)),
+        }
+
     # -- POLAR/CARTESIAN CONVERSION --
     def clearComputedData(self):
         self.data_dict['computed_out']['titles'] = []
@@ -150,34 +307,100 @@ class ReadfileData:
 
 
     @staticmethod
-    def from_filepath(filepath, loading_kwargs:dict={}) -> list:
+    def from_filepath(filepath, loading_kwargs:dict={}, cache=None, task=None) -> list:
         """detect filetype then load with appropriate function
 
         Args:
             filepath (str)
             loading_kwargs (dict): keywords passed to the loading function
+            cache (ParseCache): on disk cache of parsed pyHegel files
+            task (LoadTask): to cancel the load (raises LoadCancelled) and to receive
+                the progress and a first partial result of big files
 
         Returns:
             list: _description_
         """
-        h =  hash_file(filepath)
         metadata = os.stat(filepath)
 
+        progressive = task is not None and metadata.st_size > PROGRESSIVE_MIN_BYTES
+
         ext = filepath.split('.')[-1]
         # Get load_function, fallback to pyHegel
-        load_function = {"txt": ph_load, "hdf5": h5_load}.get(ext, ph_load)
-        data_dicts = load_function(filepath, loading_kwargs)
+        if ext == "hdf5":
+            # on reload, the file is followed and only changed rows are read
+            load_function = H5LiveReader(filepath, loading_kwargs)
+            data_dicts = load_function()
+            # data is read lazily, only the fingerprint reads the whole file:
+            # the data can be shown before
+            cached = FINGERPRINTS.get(filepath, ())[:2] == (metadata.st_size, metadata.st_mtime_ns)
+            if progressive and not cached:
+                task.partial(ReadfileData.from_loaded(filepath, metadata, None, load_function, data_dicts))
+            h = fingerprint_file(filepath, metadata, task=task)
+        else:
+            # on reload, only the appended lines are parsed
+            load_function = PhTailReader(filepath, loading_kwargs)
+            h = cache.fingerprint(filepath, metadata) if cache else None
+            if (state := cache.load(h) if cache else None) is not None:
+                FINGERPRINTS[filepath] = (metadata.st_size, metadata.st_mtime_ns, h)
+                data_dicts = load_function.load_state(state)
+            else:
+                # one read of the file for both the fingerprint and the parser
+                with map_file(filepath) as buffer:
+                    if progressive:
+                        task.partial(ph_loadHead(filepath, metadata, buffer))
+                    h = fingerprint_file(filepath, metadata, buffer, task)
+                    # same content under another path/mtime
+                    if (state := cache.load(h) if cache else None) is not None:
+                        data_dicts = load_function.load_state(state)
+                    else:
+                        load_function.task = task
+                        try:
+                            data_dicts = load_function(buffer)
+                        finally:
+                            load_function.task = None
+                if cache:
+                    cache.save(filepath, metadata, h, load_function.get_state())
+        return ReadfileData.from_loaded(filepath, metadata, h, load_function, data_dicts)
+
+    @staticmethod
+    def from_loaded(filepath, metadata, h, load_function, data_dicts) -> list:
+        """ one ReadfileData per data_dict returned by `load_function` """
         return [
             ReadfileData(
                 filepath,
                 metadata=metadata,
                 h=h,
                 data_dict=data_dict,
-                reload_function = lambda: load_function(filepath, loading_kwargs),
+                reload_function = load_function,
                 reload_function_index = i
             ) for i, data_dict in enumerate(data_dicts)
         ]
 
+    def derive(self, data_dict_updates={}) -> "ReadfileData":
+        """ New ReadfileData for computed data, sharing this one's metadata and arrays.
+        Only the dict containers are copied, shared arrays are read only views
+        (copy on write: replace them, do not write in them).
+        A derived rfdata is never reloaded from the file.
+        """
+        d = self.data_dict
+        data_dict = d.copy()
+        data_dict.x.data = readonly_view(d.x.data)
+        data_dict.y.data = readonly_view(d.y.data)
+        data_dict.out = Outs(
+            d.out.titles,
+            [readonly_view(data) for data in d.out.data],
+            readonly_view(d.out.store)
+        )
+        data_dict.update(data_dict_updates)
+        return ReadfileData(
+            self.filepath,
+            metadata=self.metadata,
+            h=self.h,
+            data_dict=data_dict,
+            reload_function=lambda: [data_dict],
+            reload_function_index=0
+        )
+
     @staticmethod
     def from_computed_array_1d(
         out_datas,
@@ -189,19 +412,16 @@ class ReadfileData:
         assert len(out_datas) >=2
         assert len(out_datas) == len(out_titles)
 
-        rfdata = deepcopy(rfdata_original)
+        rfdata = rfdata_original.derive(data_dict_updates)
         data_dict = rfdata.data_dict
-        data_dict.update(data_dict_updates)
-        data_dict['sweep_dim'] = 1
+        data_dict.sweep_dim = 1
 
-        data_dict['x']['data'] = out_datas[0]
-        data_dict['x']['title'] = out_titles[0]
-        data_dict['x']['range'] = findSweepRange1D(out_datas[0])
-        data_dict['out']['titles'] = []
-        data_dict['out']['data'] = []
-        for title, data in zip(out_titles, out_datas):
-            data_dict['out']['titles'].append(title)
-            data_dict['out']['data'].append(data)
+        data_dict.x.data = out_datas[0]
+        data_dict.x.title = out_titles[0]
+        data_dict.x.range = findSweepRange1D(out_datas[0])
+        data_dict.out = Outs(out_titles, out_datas)
+        # computed outs are plain arrays, of the displayed slab for N-d sweeps
+        data_dict.extra_axes, data_dict.slab = [], ()
 
         return rfdata
 
@@ -214,35 +434,51 @@ class ReadfileData:
         data_dict_updates
     ):
         """ first outs are interpreted as x and y """
-        rfdata = deepcopy(rfdata_original)
+        rfdata = rfdata_original.derive(data_dict_updates)
         data_dict = rfdata.data_dict
-        data_dict.update(data_dict_updates)
 
-        data_dict['sweep_dim'] = 2
+        data_dict.sweep_dim = 2
 
-        data_dict['x']['title'] = x_title
-        data_dict['y']['title'] = y_title
-        data_dict['x']['data'] = x_1d_data
-        data_dict['y']['data'] = y_1d_data
-        data_dict['x']['range'] = findSweepRange1D(x_1d_data)
-        data_dict['y']['range'] = findSweepRange1D(y_1d_data)
+        data_dict.x.title = x_title
+        data_dict.y.title = y_title
+        data_dict.x.data = x_1d_data
+        data_dict.y.data = y_1d_data
+        data_dict.x.range = findSweepRange1D(x_1d_data)
+        data_dict.y.range = findSweepRange1D(y_1d_data)
 
-        data_dict['out']['titles'] = []
-        data_dict['out']['data'] = []
-        for title, data in zip(out_titles, out_datas):
-            data_dict['out']['titles'].append(title)
-            data_dict['out']['data'].append(data)
+        data_dict.out = Outs(out_titles, out_datas)
+        # computed outs are plain arrays, of the displayed slab for N-d sweeps
+        data_dict.extra_axes, data_dict.slab = [], ()
 
         return rfdata
 
-def ph_load(filepath, loading_kwargs:dict={}) -> list[dict]:
-    """
-    Returns:
-        [data_dict], a list with one element.
-    This if for compatility with h5 case where one file can have multiple sweep dims/axes
-    ph cannot, thus always len == 1.
+def ph_loadHead(filepath, metadata, buffer, nbytes=HEAD_BYTES) -> list:
+    """ ReadfileData of the first lines of a pyHegel file, [] if they cannot be shown alone.
+    It is a static view (not reloaded) shown while the whole file is parsed.
     """
-    data_dict = deepcopy(DATA_DICT_FORMAT)
+    head = bytes(buffer[:buffer.rfind(b"\n", 0, nbytes) + 1])
+    try:
+        columns, titles, headers, end, nrows, inner_npts = ph_parseColumns(head)
+        data_dicts = [ph_buildDataDict(ph_columnsView(columns, nrows, inner_npts), list(titles), headers)]
+    except Exception:
+        # best effort: format only pyHegel reads, 2d head shorter than two inner sweeps...
+        return []
+    return ReadfileData.from_loaded(filepath, metadata, None, lambda: data_dicts, data_dicts)
+
+def header_text(header) -> str:
+    """ headers (str, bytes, lists or arrays of them...) as text """
+    if header is None:
+        return ""
+    if isinstance(header, bytes):
+        return header.decode(errors="replace")
+    if isinstance(header, str):
+        return header
+    if isinstance(header, (list, tuple, np.ndarray)):
+        return "\n".join(header_text(h) for h in header)
+    return str(header)
+
+def ph_readfilePyHegel(filepath):
+    """ read with pyHegel, as a multi sweep if possible """
     try:
         data, titles, headers = c.readfile(filepath, getheaders=True, multi_sweep='force')
     except:
@@ -250,38 +486,295 @@ def ph_load(filepath, loading_kwargs:dict={}) -> list[dict]:
             data, titles, headers = c.readfile(filepath, getheaders=True, multi_sweep=False)
         except Exception as e:
             raise e
+    return data, titles, headers
+
+PARSE_CHUNK_BYTES = 2**25 # numeric block converted by chunks of complete lines
+OUT_OF_CORE_BYTES = 2**30 # bigger files are parsed into a memory map instead of RAM
+
+def ph_parseColumns(buffer, out_of_core=False, task=None):
+    """ Native parser of pyHegel text files, from the file content (bytes, mmap).
+    The `#` header is read once to decide the layout: a 2d multi sweep
+    (2 `beforewait` in `#sweep_multi_options`) has an inner npts equal to the
+    length of the first run of the outer column.
+    The numeric block, up to the last complete line, is converted by chunks
+    straight into a (ncols, nrows) buffer, in a temporary memory map if `out_of_core`.
+
+    Raises ValueError/NotImplementedError for what pyHegel should read instead
+    (csv, no data, nd sweeps), LoadCancelled if `task` is cancelled.
+
+    Returns:
+        columns: (ncols, capacity) nan filled after nrows, capacity fits the inner sweeps,
+        titles, headers,
+        end: byte offset after the last parsed line,
+        nrows: number of data lines parsed,
+        inner_npts: None for 1d files.
+    """
+    headers = []
+    start = 0
+    while buffer[start:start + 1] == b"#":
+        stop = buffer.find(b"\n", start) + 1
+        if stop == 0:
+            raise ValueError("incomplete header")
+        headers.append(bytes(buffer[start:stop]).decode("utf-8", errors="replace"))
+        start = stop
+    if not headers:
+        raise ValueError("no header")
+    titles = [t.strip() for t in headers[-1][1:].split("\t")]
+    ncols = len(titles)
+
+    end = buffer.rfind(b"\n") + 1
+    if end <= start:
+        raise ValueError("no data")
+    first_line = bytes(buffer[start:buffer.find(b"\n", start)])
+    if b"," in first_line:
+        raise ValueError("csv file")
+
+    sweep_multi_option = next((h for h in headers if h.startswith("#sweep_multi_options")), None)
+    sweep_dim = 1
+    if sweep_multi_option is not None and isinstance(bw := ph_parseBeforeWait(sweep_multi_option), list):
+        sweep_dim = len(bw)
+    if sweep_dim not in (1, 2):
+        raise NotImplementedError(f"sweep_multi of dimension {sweep_dim}")
+
+    # chunks of complete lines, the number of lines bounds the number of rows
+    bounds = [start]
+    max_rows = 0
+    view = memoryview(buffer)
+    while bounds[-1] < end:
+        cut = buffer.find(b"\n", min(bounds[-1] + PARSE_CHUNK_BYTES, end) - 1) + 1
+        max_rows += np.count_nonzero(np.frombuffer(view[bounds[-1]:cut], dtype=np.uint8) == ord("\n"))
+        bounds.append(cut)
+    del view
+
+    columns = ph_allocColumns(ncols, max_rows, out_of_core)
+    nrows = 0
+    for chunk_start, chunk_stop in zip(bounds[:-1], bounds[1:]):
+        if task:
+            task.check()
+            task.progress((chunk_start - start) / (end - start))
+        rows = np.loadtxt(io.BytesIO(buffer[chunk_start:chunk_stop]), ndmin=2, comments="#")
+        if rows.size == 0:
+            continue
+        if rows.shape[1] != ncols:
+            raise ValueError("titles do not match the data")
+        columns[:, nrows:nrows + rows.shape[0]] = rows.T
+        nrows += rows.shape[0]
+    if nrows == 0:
+        raise ValueError("no data")
+
+    inner_npts = None
+    if sweep_dim == 2:
+        outer = columns[0, :nrows]
+        if np.isnan(outer[0]):
+            raise ValueError("outer sweep column starts with nan")
+        changes = np.flatnonzero(outer != outer[0])
+        inner_npts = int(changes[0]) if changes.size else nrows
+        # room for the nan padding of the last inner sweep
+        size = -(-nrows // inner_npts) * inner_npts
+        if size > columns.shape[1]:
+            grown = ph_allocColumns(ncols, size, out_of_core)
+            grown[:, :nrows] = columns[:, :nrows]
+            columns = grown
+
+    return columns, titles, headers, end, nrows, inner_npts
+
+def ph_allocColumns(ncols, nrows, out_of_core=False) -> np.ndarray:
+    """ nan filled (ncols, nrows) buffer, in a temporary file if out_of_core """
+    if out_of_core:
+        # the temporary file is removed when the memmap is released
+        columns = np.memmap(tempfile.TemporaryFile(), dtype=float, mode="w+", shape=(ncols, max(nrows, 1)))
+        columns.fill(np.nan)
+        return columns
+    return np.full((ncols, nrows), np.nan)
+
+def ph_columnsView(columns, nrows, inner_npts=None, min_outer_npts=0) -> np.ndarray:
+    """ data view of parsed columns like pyHegel.commands.readfile:
+    (ncols, nrows) for 1d, (ncols, outer, inner) nan padded for 2d.
+    columns must hold the padding.
+    """
+    if inner_npts is None:
+        return columns[:, :nrows]
+    nx = max(min_outer_npts, -(-nrows // inner_npts))
+    return columns[:, :nx * inner_npts].reshape(columns.shape[0], nx, inner_npts)
 
+def ph_buildDataDict(data, titles, headers) -> SweepData:
+    data_dict = SweepData()
     if data[0].ndim == 1:
-        data_dict['sweep_dim'] = 1
+        data_dict.sweep_dim = 1
         ph_build1DDataDict(data, titles, headers, data_dict)
     elif data[0].ndim == 2:
-        data_dict['sweep_dim'] = 2
+        data_dict.sweep_dim = 2
         ph_build2DDataDict(data, titles, headers, data_dict)
 
-    data_dict['beforewait'] = ph_findBeforeWait(headers)
+    data_dict.beforewait = ph_findBeforeWait(headers)
     config, comment = ph_findConfigAndComments(headers)
-    data_dict['config'] = config
-    data_dict['meta'] = comment
-    
-    return [data_dict]
+    data_dict.config = config
+    data_dict.meta = comment
+    return data_dict
+
+
+class PhTailReader:
+    """ Load function of pyHegel files, used as the ReadfileData reload_function.
+    The first call is a full load. Next calls only parse the lines appended
+    to the file since the last call (from the saved byte offset) and write
+    them at the end of the out columns, so a reload costs the new data only.
+    Falls back to a full load if the file was truncated or its columns changed.
+    The columns seen by a returned data_dict are never written to: rows that
+    would land in them (nan padding of a 2d sweep) go in a copy of the buffer.
+
+    Returns [data_dict], one element: a list like h5_load, where a file can hold several sweeps.
+    """
+
+    def __init__(self, filepath, loading_kwargs:dict={}):
+        self.filepath = filepath
+        self.loading_kwargs = loading_kwargs
+        self.titles = None
+        self.headers = None
+        self.offset = None # byte offset after the last parsed line
+        self.nrows = 0 # number of data lines parsed
+        self.columns = None # (ncols, capacity) buffer, nan after nrows
+        self.shown_rows = 0 # columns[:, :shown_rows] are views of the last data_dict
+        self.inner_npts = None # npts of the inner sweep for 2d files, None for 1d
+        self.min_outer_npts = 0 # outer npts of the first load (pyHegel pads incomplete sweeps)
+        self.out_of_core = False # columns in a temporary memory map
+        self.task = None # LoadTask of the full load, see from_filepath
+
+    def __call__(self, buffer=None) -> list[SweepData]:
+        """ buffer: content of the file (bytes, mmap) if already read, for a full load """
+        if self.offset is None or os.path.getsize(self.filepath) < self.offset:
+            return self.full_load(buffer)
+        try:
+            return self.tail_load()
+        except ValueError:
+            # new lines do not fit the columns, start over
+            return self.full_load()
+
+    def full_load(self, buffer=None) -> list[SweepData]:
+        try:
+            if buffer is None:
+                with map_file(self.filepath) as buffer:
+                    return self.full_load(buffer)
+            self.out_of_core = self._outOfCore(len(buffer))
+            (self.columns, titles, headers, self.offset,
+                self.nrows, self.inner_npts) = ph_parseColumns(buffer, self.out_of_core, self.task)
+            self.min_outer_npts = 0
+        except (ValueError, NotImplementedError):
+            data, titles, headers = ph_readfilePyHegel(self.filepath)
+            self._setColumnsFromData(data)
+        self.titles, self.headers = list(titles), headers
+        return [self._buildDataDict()]
+
+    def _setColumnsFromData(self, data):
+        """ columns and offset from pyHegel data """
+        data = np.asarray(data, dtype=float)
+        ncols = data.shape[0]
+        if data[0].ndim == 2:
+            self.min_outer_npts, self.inner_npts = data[0].shape
+        else:
+            self.min_outer_npts, self.inner_npts = 0, None
+        flat = data.reshape(ncols, -1)
+        # trailing rows full of nan are padding of an incomplete sweep
+        filled = np.flatnonzero(~np.isnan(flat).all(axis=0))
+        self.nrows = filled[-1] + 1 if filled.size else 0
+        self.offset = self._findOffsetAfterRows(self.nrows)
+        self.out_of_core = self._outOfCore(os.path.getsize(self.filepath))
+        self.columns = ph_allocColumns(ncols, max(flat.shape[1], 1), self.out_of_core)
+        self.columns[:, :flat.shape[1]] = flat
+
+    def _outOfCore(self, file_size) -> bool:
+        return self.loading_kwargs.get("out_of_core", file_size > OUT_OF_CORE_BYTES)
+
+    def get_state(self) -> dict:
+        """ what is needed to rebuild the data_dict and continue reading the file """
+        return {
+            "columns": self.columns[:, :self.nrows] if self.inner_npts is None else self.columns,
+            "titles": self.titles,
+            "headers": self.headers,
+            "offset": int(self.offset),
+            "nrows": int(self.nrows),
+            "inner_npts": None if self.inner_npts is None else int(self.inner_npts),
+            "min_outer_npts": int(self.min_outer_npts),
+        }
+
+    def load_state(self, state: dict) -> list[SweepData]:
+        for key, value in state.items():
+            setattr(self, key, value)
+        self.out_of_core = self._outOfCore(os.path.getsize(self.filepath))
+        return [self._buildDataDict()]
+
+    def tail_load(self) -> list[SweepData]:
+        with open(self.filepath, "rb") as f:
+            f.seek(self.offset)
+            block = f.read()
+        # only complete lines, the last one may still be written
+        end = block.rfind(b"\n") + 1
+        if end == 0:
+            return [self._buildDataDict()]
+        rows = np.loadtxt(io.BytesIO(block[:end]), ndmin=2, comments="#")
+        if rows.size and rows.shape[1] != self.columns.shape[0]:
+            raise ValueError("number of columns changed")
+        self._append(rows)
+        self.offset += end
+        return [self._buildDataDict()]
+
+    def _reserve(self, size, copy=False):
+        """ grow the columns buffer (amortized) to hold at least `size` rows.
+        copy: new buffer even if it is big enough
+        """
+        if copy or size > self.columns.shape[1]:
+            capacity = max(size, 2 * self.columns.shape[1]) if size > self.columns.shape[1] else self.columns.shape[1]
+            columns = ph_allocColumns(self.columns.shape[0], capacity, self.out_of_core)
+            columns[:, :self.nrows] = self.columns[:, :self.nrows]
+            self.columns = columns
+            self.shown_rows = 0
+
+    def _append(self, rows):
+        needed = self.nrows + rows.shape[0]
+        # copy on write if the rows go in the shown padding
+        self._reserve(needed, copy=rows.shape[0] > 0 and self.nrows < self.shown_rows)
+        self.columns[:, self.nrows:needed] = rows.T
+        self.nrows = needed
+
+    def _buildDataDict(self) -> SweepData:
+        self.shown_rows = self.nrows
+        if self.inner_npts is not None:
+            nx = max(self.min_outer_npts, -(-self.nrows // self.inner_npts))
+            self._reserve(nx * self.inner_npts)
+            self.shown_rows = nx * self.inner_npts
+        data = ph_columnsView(self.columns, self.nrows, self.inner_npts, self.min_outer_npts)
+        # ph_build2DDataDict can rename titles, give it a copy
+        return ph_buildDataDict(data, list(self.titles), self.headers)
+
+    def _findOffsetAfterRows(self, nrows) -> int:
+        """ byte offset just after the `nrows`-th data line """
+        offset = 0
+        count = 0
+        with open(self.filepath, "rb") as f:
+            for line in f:
+                if count == nrows:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                stripped = line.strip()
+                if stripped and not stripped.startswith(b"#"):
+                    count += 1
+        return offset
 
 def ph_build1DDataDict(data, titles, header, data_dict):
     # in one dimension, we use the x and out keys
     x_data = data[0]
-    data_dict['x']['data'] = x_data
-    data_dict['x']['title'] = titles[0]
-    data_dict['x']['range'] = findSweepRange1D(x_data)
-
-    data_dict['out']['titles'] = []
-    data_dict['out']['data'] = []
-    rev_data = True if data_dict['x']['range'][3] < 0 else False
-    for i, title in enumerate(titles):
-        data_dict['out']['titles'].append(title)
-        out_data = data[i][::-1] if rev_data else data[i]
-        data_dict['out']['data'].append(out_data)
-    
-    time_data = data_dict['out']['data'][-1]
-    data_dict['sweep_time'] = [np.nanmin(time_data), np.nanmax(time_data)]
+    data_dict.x.data = x_data
+    data_dict.x.title = titles[0]
+    data_dict.x.range = findSweepRange1D(x_data)
+
+    rev_data = True if data_dict.x.range.step < 0 else False
+    out_datas = [data[i][::-1] if rev_data else data[i] for i in range(len(titles))]
+    # out channels are views of the parsed columns
+    data_dict.out = Outs(titles, out_datas, store=data)
+
+    time_data = data_dict.out.data[-1]
+    data_dict.sweep_time = [np.nanmin(time_data), np.nanmax(time_data)]
 
 def ph_detectXYIndex(titles):
     # manually detect if the first two columns are actually the same value:
@@ -293,31 +786,32 @@ def ph_detectXYIndex(titles):
 def ph_build2DDataDict(data, titles, headers, data_dict):
     x_index, y_index = ph_detectXYIndex(titles)
     data_x, data_y = data[x_index], data[y_index]
-    data_dict['x']['data'] = data_x
-    data_dict['y']['data'] = data_y
+    data_dict.x.data = data_x
+    data_dict.y.data = data_y
     # check if titles are the same:
     if titles[x_index] == titles[y_index]:
         titles[x_index] = titles[y_index] + '_'
-    data_dict['x']['title'] = titles[x_index]
-    data_dict['y']['title'] = titles[y_index]
+    data_dict.x.title = titles[x_index]
+    data_dict.y.title = titles[y_index]
     ph_findSweepRange2D(data, headers, data_dict)
-    data_dict['alternate'] = False if np.array_equal(data_y[0], data_y[1]) else True
+    data_dict.alternate = False if np.array_equal(data_y[0], data_y[1]) else True
 
-    data_dict['out']['titles'] = []
-    data_dict['out']['data'] = []
-    rev_x = True if data_dict['x']['range'][3] < 0 else False
-    rev_y = True if data_dict['y']['range'][3] < 0 else False
+    out_titles, out_datas = [], []
+    rev_x = True if data_dict.x.range.step < 0 else False
+    rev_y = True if data_dict.y.range.step < 0 else False
     for i, title in enumerate(titles[y_index+1:]):
-        data_dict['out']['titles'].append(title)
+        out_titles.append(title)
         out_data = data[i+1+y_index] # we start at index y+1
         # reverse if needed
         out_data = out_data[::-1] if rev_x else out_data
         out_data = out_data[:,::-1] if rev_y else out_data
         #print(rev_x, rev_y)
-        data_dict['out']['data'].append(out_data)
+        out_datas.append(out_data)
+    # out channels are views of the parsed columns
+    data_dict.out = Outs(out_titles, out_datas, store=data)
 
-    time_data = data_dict['out']['data'][-1]
-    data_dict['sweep_time'] = [np.nanmin(time_data), np.nanmax(time_data)]
+    time_data = data_dict.out.data[-1]
+    data_dict.sweep_time = [np.nanmin(time_data), np.nanmax(time_data)]
 
 def ph_findSweepRange2D(data, headers, data_dict):
     # try to find the ranges of the 2d sweep
@@ -346,8 +840,8 @@ def ph_findSweepRange2D(data, headers, data_dict):
     array_x = data[0][:,0]
     range_x = findSweepRange1D(array_x)
         
-    data_dict['x']['range'] = range_x
-    data_dict['y']['range'] = [start_y, stop_y, nbpts_y, step_y]
+    data_dict.x.range = range_x
+    data_dict.y.range = Range(start_y, stop_y, nbpts_y, step_y)
 
 def ph_findConfigAndComments(headers):
     comments = []
@@ -360,7 +854,9 @@ def ph_findConfigAndComments(headers):
     return config, comments
 
 def ph_findBeforeWait(headers):
-    sweep_multi_option = headers[-3]
+    return ph_parseBeforeWait(headers[-3])
+
+def ph_parseBeforeWait(sweep_multi_option):
     # "#sweep_multi_options:= {..., 'beforewait': [0.02, 0.02], ... };\n"
     # or "#sweep_multi_options:= {..., 'beforewait': [0.02], ... };\n"
     beforewait = []
@@ -374,9 +870,10 @@ def ph_findBeforeWait(headers):
     return beforewait
 
 
-def h5_load(filepath, loading_kwargs:dict={}) -> list[dict]:
+def h5_load(filepath, loading_kwargs:dict={}) -> list[SweepData]:
     """
     loading_kwargs: {"h5": {"group_name": group_name, "result_name": result_name}}
+        result_name None: every result of the group
 
     Returns:
         list of data_dict, one for every axes_tuple in the file
@@ -384,109 +881,461 @@ def h5_load(filepath, loading_kwargs:dict={}) -> list[dict]:
 
     if (kwargs := loading_kwargs.get("h5", None)) is not None:
         print("h5_load ", kwargs)
-        return h5_load_from_results(filepath, kwargs["group_name"], kwargs["result_name"])
+        return h5_load_from_results(filepath, kwargs["group_name"], kwargs.get("result_name"))
 
-    with h5py.File(filepath, "r", swmr=True) as file:
-        data, meta = file.get("data"), file.get("meta")
-        version = str(meta.attrs.get("VERSION"))
-        # Test global version support
-        if version not in SUPPORTED_HDF5_VERSIONS:
-            raise NotImplementedError("VERSION not supported :)")
-
-        sweep_names = data.attrs.get("sweeped_ax_names")
-        out_names = data.attrs.get("result_data_names")
-        if version in ("0.4", "0.5"):
-            data_dicts = []
-            # .4+ can have 1d, 2d, nd sweep in one file, all with different axes
-            # We separate build one data_dict per axes_tuple
-            axes_list = []
-            out_lists = []
-            # Collect every swept_axes tuples, with their out_names
-            for i, out_name in enumerate(out_names):
-                swept_axes = list(file["data"][out_name].attrs.get("axes"))
-                if swept_axes not in axes_list:
-                    axes_list.append(swept_axes)
-                    out_lists.append([out_name])
-                else:
-                    out_lists[axes_list.index(swept_axes)].append(out_name)
-            # For each axes_tuple, make a data_dicts with the corresponding outs
-            for axes, out_list in zip(axes_list, out_lists):
-                match len(axes):
-                    case 1:
-                        data_dict = deepcopy(DATA_DICT_FORMAT)
-                        data_dict['sweep_dim'] = 1
-                        h5_build1DDataDict(data, axes[0], out_list, data_dict)
-                    case 2:
-                        data_dict = deepcopy(DATA_DICT_FORMAT)
-                        data_dict['sweep_dim'] = 2
-                        h5_build2DDataDict(data, axes, out_list, data_dict)
-                    case _:
-                        raise NotImplementedError("Sweep dimension not 1 or 2")
-                        continue
-                data_dict['config'] = meta.attrs.get("config", [])
-                data_dict['meta'] = [f"{k}:{v}" for k, v in meta.attrs.items()]
-                data_dicts.append(data_dict)
-                # print(data_dicts)
-            return data_dicts
-        
-        elif version in ("0.1", "0.2", "0.3"):
-            data_dict = deepcopy(DATA_DICT_FORMAT)
-            if len(sweep_names) == 1:
-                data_dict['sweep_dim'] = 1
-                h5_build1DDataDict(data, sweep_names[0], out_names, data_dict)
-            elif len(sweep_names) == 2:
-                data_dict['sweep_dim'] = 2
-                h5_build2DDataDict(data, sweep_names, out_names, data_dict)
-            else:
-                raise NotImplementedError(f"Sweep dimension not 1 or 2")
+    with H5_POOL.open(filepath) as file:
+        return h5_buildDataDicts(file)
+
+def h5_buildDataDicts(file: h5py.File, reading=None, index=None) -> list[SweepData]:
+    """ one data_dict for every axes_tuple of an opened file.
+    reading: how axes and channels are read, see H5LazyReading.
+    index: only this data_dict is built, the others are None.
+    """
+    data, meta = file.get("data"), file.get("meta")
+    version = str(meta.attrs.get("VERSION"))
+    # Test global version support
+    if version not in SUPPORTED_HDF5_VERSIONS:
+        raise NotImplementedError("VERSION not supported :)")
+
+    sweep_names = data.attrs.get("sweeped_ax_names")
+    out_names = data.attrs.get("result_data_names")
+    # axes shared by several data_dicts are read once
+    reading = reading or H5LazyReading()
+    if version in ("0.4", "0.5"):
+        data_dicts = []
+        # .4+ can have 1d, 2d, nd sweep in one file, all with different axes
+        # We separate build one data_dict per axes_tuple
+        for i, (axes, out_list) in enumerate(h5_groupByAxes(data, out_names)):
+            if index is not None and i != index:
+                data_dicts.append(None)
+                continue
+            data_dict = h5_buildAxesDataDict(data, axes, out_list, reading)
+            data_dict.config = meta.attrs.get("config", [])
+            data_dict.meta = [f"{k}:{v}" for k, v in meta.attrs.items()]
+            data_dicts.append(data_dict)
+            # print(data_dicts)
+        return data_dicts
     
-            data_dict['config'] = meta.attrs.get("config")
-            data_dict['meta'] = meta.attrs.get("cell")
+    elif version in ("0.1", "0.2", "0.3"):
+        data_dict = h5_buildAxesDataDict(data, list(sweep_names), out_names, reading)
 
-            return [data_dict]
+        data_dict.config = meta.attrs.get("config")
+        data_dict.meta = meta.attrs.get("cell")
 
-def h5_build1DDataDict(data, x_name, out_names, data_dict):
+        return [data_dict]
+
+def h5_groupByAxes(data: h5py.Group, out_names) -> list[tuple[list, list]]:
+    """ [(swept_axes, out_names with these axes), ...] in order of appearance """
+    axes_list = []
+    out_lists = []
+    # Collect every swept_axes tuples, with their out_names
+    for out_name in out_names:
+        swept_axes = list(data[out_name].attrs.get("axes"))
+        if swept_axes not in axes_list:
+            axes_list.append(swept_axes)
+            out_lists.append([out_name])
+        else:
+            out_lists[axes_list.index(swept_axes)].append(out_name)
+    return list(zip(axes_list, out_lists))
+
+def h5_buildAxesDataDict(data, axes, out_names, reading=None) -> SweepData:
+    """ data_dict of the `out_names` swept over `axes` (1d, 2d or nd) """
+    data_dict = SweepData()
+    match len(axes):
+        case 0:
+            raise NotImplementedError("Sweep without axes")
+        case 1:
+            data_dict.sweep_dim = 1
+            h5_build1DDataDict(data, axes[0], out_names, data_dict, reading)
+        case 2:
+            data_dict.sweep_dim = 2
+            h5_build2DDataDict(data, axes, out_names, data_dict, reading)
+        case _:
+            data_dict.sweep_dim = 2 # displayed as 2d slabs
+            h5_buildNDDataDict(data, axes, out_names, data_dict, reading)
+    return data_dict
+
+def h5_build1DDataDict(data, x_name, out_names, data_dict, reading=None):
     # in one dimension, we use the x and out keys
-    x_data = data.get(x_name)[:]
-    data_dict['x']['data'] = x_data
-    data_dict['x']['title'] = x_name
-    data_dict['x']['range'] = findSweepRange1D(x_data)
-
-    data_dict['out']['titles'] = [x_name]
-    data_dict['out']['data'] = [x_data]
-    for i, title in enumerate(out_names):
-        data_dict['out']['titles'].append(title)
-        data_dict['out']['data'].append(data.get(title)[:])
-
-def h5_build2DDataDict(data, sweeped_names, out_names, data_dict):
-    data_dict['x']['title'] = x_lbl = sweeped_names[0]
-    data_dict['y']['title'] = y_lbl = sweeped_names[1]
-    data_x, data_y = data[x_lbl][:], data[y_lbl][:]
-    data_dict['x']['data'] = data_x
-    data_dict['y']['data'] = data_y
-
-    data_dict['x']['range'] = findSweepRange1D(data_x)
-    data_dict['y']['range'] = findSweepRange1D(data_y)
-
-    data_dict['out']['titles'] = []
-    data_dict['out']['data'] = []
-    for i, title in enumerate(out_names):
-        data_dict['out']['titles'].append(title)
-        out_data = data[title][:]
-        data_dict['out']['data'].append(out_data)
+    reading = reading or H5LazyReading()
+    x_data = reading.axis(data.get(x_name))
+    data_dict.x.data = x_data
+    data_dict.x.title = x_name
+    data_dict.x.range = findSweepRange1D(x_data)
+
+    data_dict.out = Outs(
+        [x_name, *out_names],
+        [x_data, *(reading.channel(data.get(title)) for title in out_names)]
+    )
+
+def h5_build2DDataDict(data, sweeped_names, out_names, data_dict, reading=None):
+    reading = reading or H5LazyReading()
+    data_dict.x.title = x_lbl = sweeped_names[0]
+    data_dict.y.title = y_lbl = sweeped_names[1]
+    data_x, data_y = reading.axis(data[x_lbl]), reading.axis(data[y_lbl])
+    data_dict.x.data = data_x
+    data_dict.y.data = data_y
+
+    data_dict.x.range = findSweepRange1D(data_x)
+    data_dict.y.range = findSweepRange1D(data_y)
+
+    data_dict.out = Outs(out_names, [reading.channel(data[title]) for title in out_names])
+
+    return data_dict
+
+def h5_buildNDDataDict(data, sweeped_names, out_names, data_dict, reading=None):
+    """ N-d sweep: x, y are the first two axes, the others are extra_axes.
+    Channels are H5SlabDataset, read one 2d slab at a time.
+    """
+    reading = reading or H5LazyReading()
+    h5_build2DDataDict(data, sweeped_names[:2], [], data_dict, reading)
+    for name in sweeped_names[2:]:
+        axis_data = reading.axis(data[name])
+        data_dict.extra_axes.append(Axis(name, axis_data, findSweepRange1D(axis_data)))
+    data_dict.slab = (0,) * len(data_dict.extra_axes)
+
+    data_dict.out = Outs(out_names, [H5SlabDataset.from_dataset(data[title]) for title in out_names])
 
     return data_dict
 
 
+class ChannelLRU:
+    """ Thread safe LRU of the channels read by H5LazyDataset.
+    Bounded by number of channels and by total bytes.
+    """
+
+    def __init__(self, max_channels=8, max_bytes=2**30):
+        self.max_channels = max_channels
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> np.ndarray
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is not None:
+                self._entries.move_to_end(key)
+            return arr
+
+    def put(self, key, arr):
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key).nbytes
+            self._entries[key] = arr
+            self._nbytes += arr.nbytes
+            # always keep the last one, even if bigger than max_bytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_channels or self._nbytes > self.max_bytes
+            ):
+                _, old = self._entries.popitem(last=False)
+                self._nbytes -= old.nbytes
+
+    def invalidate(self, filepath):
+        """ drop every channel of `filepath` """
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == filepath]:
+                self._nbytes -= self._entries.pop(key).nbytes
+
+H5_CHANNEL_CACHE = ChannelLRU()
+
+
+class H5LazyDataset:
+    """ Array-like proxy on a dataset of an hdf5 file.
+    Nothing is read on creation, the dataset is read when asked
+    (np.asarray(proxy), proxy[...]) and kept in H5_CHANNEL_CACHE.
+    The file stat is part of the cache key so a modified file is read again.
+    """
+
+    def __init__(self, filepath, name, shape, dtype, stat_key=None):
+        self.filepath = filepath
+        self.name = name # full path of the dataset in the file
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.stat_key = stat_key
+
+    @classmethod
+    def from_dataset(cls, dataset: h5py.Dataset):
+        filepath = dataset.file.filename
+        return cls(filepath, dataset.name, dataset.shape, dataset.dtype, H5_POOL.stat_key(filepath))
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def read(self) -> np.ndarray:
+        key = (self.filepath, self.name, self.stat_key)
+        arr = H5_CHANNEL_CACHE.get(key)
+        if arr is None:
+            with H5_POOL.open(self.filepath) as file:
+                arr = file[self.name][()]
+            H5_CHANNEL_CACHE.put(key, arr)
+        return arr
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.read()
+        if dtype is not None and np.dtype(dtype) != arr.dtype:
+            return arr.astype(dtype)
+        return arr.copy() if copy else arr
+
+    def __getitem__(self, key):
+        return self.read()[key]
+
+    def __repr__(self):
+        return f"H5LazyDataset({self.filepath!r}, {self.name!r}, shape={self.shape})"
+
+
+class H5LazyReading:
+    """ Default reading used by h5_build*DataDict:
+    axes are read on open, channels are H5LazyDataset.
+    One per file session, an axis shared by several data_dicts is read once.
+    """
+
+    def __init__(self):
+        self.axes = {} # dataset name -> np.ndarray
+
+    def axis(self, dataset: h5py.Dataset) -> np.ndarray:
+        if dataset.name not in self.axes:
+            self.axes[dataset.name] = dataset[()]
+        return self.axes[dataset.name]
+
+    def channel(self, dataset: h5py.Dataset):
+        return H5LazyDataset.from_dataset(dataset)
+
+
+class H5SlabDataset(H5LazyDataset):
+    """ Channel of an N-d sweep, (x, y, *extra) shaped.
+    Read one 2d slab at a time, see read_slab.
+    """
+
+    def __init__(self, filepath, name, shape, dtype, stat_key=None, chunks=None):
+        super().__init__(filepath, name, shape, dtype, stat_key)
+        self.chunks = chunks
+
+    @classmethod
+    def from_dataset(cls, dataset: h5py.Dataset):
+        slab_dataset = super().from_dataset(dataset)
+        slab_dataset.chunks = dataset.chunks
+        return slab_dataset
+
+    def read_slab(self, index) -> np.ndarray:
+        """ 2d array self[:, :, *index] """
+        with H5_POOL.open(self.filepath) as file:
+            return h5_readSlab(file[self.name], index)
+
+    def __repr__(self):
+        return f"H5SlabDataset({self.filepath!r}, {self.name!r}, shape={self.shape}, chunks={self.chunks})"
+
+
+def h5_readSlab(dataset: h5py.Dataset, index) -> np.ndarray:
+    """ dataset[:, :, *index], read chunk by chunk into one buffer.
+    Only the chunks crossing the slab are read, chunks not written yet
+    are skipped and stay unfilled (nan).
+    """
+    index = tuple(int(i) for i in index)
+    slab = h5_unfilledArray(dataset, dataset.shape[:2])
+    if dataset.chunks is None:
+        slab[...] = dataset[(slice(None), slice(None), *index)]
+        return slab
+
+    selection = (slice(None), slice(None), *(slice(i, i + 1) for i in index))
+    for chunk in dataset.iter_chunks(selection):
+        offset = tuple(s.start - s.start % c for s, c in zip(chunk, dataset.chunks))
+        if dataset.id.get_chunk_info_by_coord(offset).byte_offset is None:
+            continue # not allocated
+        slab[chunk[:2]] = dataset[chunk].reshape(slab[chunk[:2]].shape)
+    return slab
+
+
+class H5LiveDataset(H5LazyDataset):
+    """ Channel of a file followed by a H5LiveReader, read (mirrored) when asked """
+
+    def __init__(self, reader, dataset: h5py.Dataset):
+        super().__init__(reader.filepath, dataset.name, dataset.shape, dataset.dtype)
+        self.reader = reader
+
+    def read(self) -> np.ndarray:
+        return self.reader.read(self.name)
+
+
+class H5Mirror:
+    """ In memory copy of a dataset, valid up to `frontier` (first row not completely written).
+    `array` is shown once returned: new rows then go in a copy, never in it.
+    """
+    __slots__ = ("array", "frontier", "generation")
+
+    def __init__(self, array):
+        self.array = array
+        self.frontier = 0
+        self.generation = -1
+
+
+class H5LiveReader:
+    """ Load function of hdf5 files, used as the ReadfileData reload_function.
+    The first call is a lazy h5_load. The next ones (reloads, auto update) follow
+    the file: it stays opened in SWMR mode and every dataset read is mirrored in memory.
+    On the next reload the dataset is `refresh()`ed and only the rows from the
+    fill frontier are read again, the frontier being the first row still holding
+    the fill value (nan for floats). Reading stops at the first block of unwritten rows
+    followed by an unallocated chunk.
+    A reload rebuilds one data_dict (`index`), its channels are H5LiveDataset:
+    only the channels asked are mirrored (ReadfileData.load_next preloads the shown
+    ones on the worker), mirrors not read during the last reload are dropped.
+    The arrays of the shown data_dict are not written to (see H5Mirror).
+
+    Returns a list of data_dict like h5_load.
+    """
+
+    BLOCK_BYTES = 2**20 # minimum size of one read
+
+    def __init__(self, filepath, loading_kwargs:dict={}):
+        self.filepath = filepath
+        self.loading_kwargs = loading_kwargs
+        self.file = None
+        self.loaded = False
+        self.generation = 0 # incremented on every reload, mirrors older than that are refreshed
+        self.mirrors = {} # dataset name -> H5Mirror
+        self._lock = threading.RLock()
+
+    def __call__(self, index=None) -> list[SweepData]:
+        """ index: only this data_dict is rebuilt on a reload, the others are None """
+        if not self.loaded or "h5" in self.loading_kwargs:
+            # results groups are not written live
+            self.loaded = True
+            return h5_load(self.filepath, self.loading_kwargs)
+        with self._lock:
+            # channels not shown anymore
+            self.mirrors = {
+                name: mirror for name, mirror in self.mirrors.items()
+                if mirror.generation >= self.generation - 1
+            }
+            self.generation += 1
+            return h5_buildDataDicts(self._open(), reading=self, index=index)
+
+    def __deepcopy__(self, memo):
+        # an opened h5py.File cannot be copied, the copy reopens it if needed
+        return H5LiveReader(self.filepath, self.loading_kwargs)
+
+    def _open(self) -> h5py.File:
+        if self.file is None:
+            # kept opened to be refresh()ed, not pooled
+            self.file = h5py.File(self.filepath, "r", swmr=True, **H5_POOL.rdcc)
+        return self.file
+
+    def close(self):
+        with self._lock:
+            if self.file is not None:
+                self.file.close()
+            self.file = None
+            self.mirrors = {}
+
+    # reading interface of h5_build*DataDict
+    def axis(self, dataset: h5py.Dataset) -> np.ndarray:
+        return self.read(dataset.name)
+
+    def channel(self, dataset: h5py.Dataset):
+        return H5LiveDataset(self, dataset)
+
+    def read(self, name) -> np.ndarray:
+        with self._lock:
+            mirror = self.mirrors.get(name)
+            if mirror is not None and mirror.generation == self.generation:
+                return mirror.array
+
+            dataset = self._open()[name]
+            dataset.refresh()
+            shown = mirror is not None
+            if mirror is None or mirror.array.shape[1:] != dataset.shape[1:]:
+                mirror = self.mirrors[name] = H5Mirror(h5_unfilledArray(dataset, dataset.shape))
+            elif mirror.array.shape[0] != dataset.shape[0]:
+                # resized along the first axis, keep what is complete
+                array = h5_unfilledArray(dataset, dataset.shape)
+                mirror.frontier = min(mirror.frontier, dataset.shape[0])
+                array[:mirror.frontier] = mirror.array[:mirror.frontier]
+                mirror.array = array
+                shown = False
+
+            self._readFromFrontier(dataset, mirror, shown)
+            mirror.generation = self.generation
+            return mirror.array
+
+    def _readFromFrontier(self, dataset: h5py.Dataset, mirror: H5Mirror, shown=False):
+        """ shown: mirror.array was returned before, it is copied if new rows are read """
+        array = mirror.array
+        nrows = array.shape[0] if array.ndim else 0
+        if nrows == 0:
+            mirror.array = np.array(dataset[()], dtype=dataset.dtype)
+            return
+        # blocks aligned on the chunks
+        chunk_rows = dataset.chunks[0] if dataset.chunks else 1
+        row_bytes = max(array[:1].nbytes, 1)
+        block = max(chunk_rows, self.BLOCK_BYTES // row_bytes // chunk_rows * chunk_rows)
+
+        start = mirror.frontier - mirror.frontier % chunk_rows
+        frontier = None
+        blocks = []
+        for r in range(start, nrows, block):
+            stop = min(r + block, nrows)
+            rows = dataset[r:stop]
+            blocks.append((r, rows))
+            unfilled = h5_unfilledMask(dataset, rows).reshape(stop - r, -1)
+            partial = unfilled.any(axis=1)
+            if frontier is None and partial.any():
+                frontier = r + int(np.argmax(partial))
+            if unfilled[-1].all() and not h5_rowAllocated(dataset, stop):
+                # the rest is not written yet (a row of nan can be a measurement,
+                # the next chunk tells)
+                break
+        mirror.frontier = nrows if frontier is None else frontier
+
+        equal_nan = dataset.dtype.kind in "fc"
+        if shown and all(np.array_equal(rows, array[r:r + len(rows)], equal_nan=equal_nan) for r, rows in blocks):
+            return
+        if shown:
+            # copy on write, the shown array stays as it is
+            array = mirror.array = array.copy()
+        for r, rows in blocks:
+            array[r:r + len(rows)] = rows
+
+
+def h5_unfilledArray(dataset: h5py.Dataset, shape) -> np.ndarray:
+    """ array of `shape` holding the value of unwritten elements of `dataset` """
+    if dataset.dtype.kind in "fc":
+        return np.full(shape, np.nan, dtype=dataset.dtype)
+    return np.full(shape, dataset.fillvalue, dtype=dataset.dtype)
+
+def h5_unfilledMask(dataset: h5py.Dataset, array) -> np.ndarray:
+    if dataset.dtype.kind in "fc":
+        return np.isnan(array)
+    return array == dataset.fillvalue
+
+def h5_rowAllocated(dataset: h5py.Dataset, row) -> bool:
+    """ True if the chunk holding `row` has been written to. Unknown (contiguous
+    dataset, old hdf5 library) is True: reading goes on.
+    """
+    if row >= dataset.shape[0]:
+        return False
+    if dataset.chunks is None:
+        return True
+    try:
+        info = dataset.id.get_chunk_info_by_coord((row,) + (0,) * (dataset.ndim - 1))
+    except (AttributeError, RuntimeError):
+        return True
+    return info.byte_offset is not None
+
+
 def h5_preview_results_group(filepath, handler = lambda res_grp: True):
     """Call `handler` with the file `results` section if VERSION is supported and the group `results` exists. Else return False.
-    Fn as argument because we do not want the file to stay opened.
+    Fn as argument because the group is only valid while the file is borrowed from H5_POOL.
 
     handler: Callable[h5py.Group]
 
 
     """
-    with h5py.File(filepath, "r", swmr=True) as file:
+    with H5_POOL.open(filepath) as file:
         meta = file.get("meta")
         version = str(meta.attrs.get("VERSION"))
         if version not in SUPPORTED_HDF5_VERSIONS_WITH_RESULTS:
@@ -497,32 +1346,30 @@ def h5_preview_results_group(filepath, handler = lambda res_grp: True):
         
         return handler(file.get("results"))
 
-def h5_load_from_results(filepath, group_name, result_name):
+def h5_load_from_results(filepath, group_name, result_name=None):
+    """ data_dict of `result_name` in the results group `group_name`.
+    result_name None: every result of the group, in one file session,
+    one data_dict per axes_tuple like h5_load.
+    """
 
     def load(res_group):
         group = res_group.get(group_name)
-
-        swept_axes = list(group[result_name].attrs.get("axes"))
-        out_list = [result_name]
-        special_type = group[result_name].attrs.get("res_type", None)
-        if special_type is not None:
-            print(f"{special_type=}")
-
-        if len(swept_axes) == 1:
-            data_dict = deepcopy(DATA_DICT_FORMAT)
-            data_dict['sweep_dim'] = 1
-            h5_build1DDataDict(group, swept_axes[0], out_list, data_dict)
-        
-        elif len(swept_axes) == 2:
-            data_dict = deepcopy(DATA_DICT_FORMAT)
-            data_dict['sweep_dim'] = 2
-            h5_build2DDataDict(group, swept_axes, out_list, data_dict)
-
+        if result_name is None:
+            result_names = list(group.attrs["result_data_names"])
         else:
-            raise NotImplementedError("Sweep dimension not 1 or 2")
-                    
+            result_names = [result_name]
 
-        return [data_dict]
+        for name in result_names:
+            special_type = group[name].attrs.get("res_type", None)
+            if special_type is not None:
+                print(f"{name}: {special_type=}")
+
+        # axes shared by several results are read once
+        reading = H5LazyReading()
+        return [
+            h5_buildAxesDataDict(group, axes, out_list, reading)
+            for axes, out_list in h5_groupByAxes(group, result_names)
+        ]
 
     return h5_preview_results_group(filepath, handler=load)
 
@@ -543,18 +1390,68 @@ def findSweepRange1D(array):
         elif not np.isnan(array[1]):
             step = array[1] - array[0]
             stop = start + step * (nbpts - 1)
-    return [start, stop, nbpts, step]
+    return Range(start, stop, nbpts, step)
     
 
-def hash_file(filepath: str) -> str:
+HASH_CHUNK_BYTES = 2**24 # the hash of big files can be cancelled between chunks
+
+def hash_file(filepath: str, task=None) -> str:
     if not os.path.isfile(filepath):
         raise FileNotFoundError(filepath)
 
-    h = hashlib.sha256()
+    with map_file(filepath) as buffer:
+        return hash_buffer(buffer, task)
+
+def hash_buffer(buffer, task=None) -> str:
+    """ sha256 of `buffer`, by chunks: raises LoadCancelled as soon as `task` is cancelled """
+    sha = hashlib.sha256()
+    view = memoryview(buffer)
+    try:
+        for start in range(0, len(view), HASH_CHUNK_BYTES):
+            if task:
+                task.check()
+            sha.update(view[start:start + HASH_CHUNK_BYTES])
+    finally:
+        view.release()
+    return sha.hexdigest()
+
+FINGERPRINTS = {} # filepath -> (size, mtime_ns, hash) of the last load
+
+def fingerprint_file(filepath: str, metadata: os.stat_result = None, buffer=None, task=None) -> str:
+    """ sha256 of the file content, computed from `buffer` if given.
+    Not computed again if size and mtime did not change since the last call for this path.
+    task: LoadTask, checked between chunks (see hash_buffer)
+    """
+    metadata = metadata or os.stat(filepath)
+    stat_key = (metadata.st_size, metadata.st_mtime_ns)
+    cached = FINGERPRINTS.get(filepath)
+    if cached is not None and cached[:2] == stat_key:
+        return cached[2]
+
+    if buffer is None:
+        h = hash_file(filepath, task)
+    else:
+        h = hash_buffer(buffer, task)
+    FINGERPRINTS[filepath] = (*stat_key, h)
+    return h
+
+@contextmanager
+def map_file(filepath: str):
+    """ read only memory map of the whole file (b"" if empty) """
     with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+def readonly_view(arr):
+    """ read only view of a numpy array, anything else is returned as is """
+    if not isinstance(arr, np.ndarray):
+        return arr
+    view = arr.view()
+    view.flags.writeable = False
+    return view
 
 def last_not_nan(arr):
     arr = np.asarray(arr)
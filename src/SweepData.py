@@ -0,0 +1,118 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Range(NamedTuple):
+    """ range of a swept axis, as estimated from the data/headers """
+    start: float = np.nan
+    stop: float = np.nan
+    nbpts: int = 0
+    step: float = np.nan
+
+
+class Axis:
+    """ swept axis: title, values and range """
+    __slots__ = ("title", "data", "range")
+
+    def __init__(self, title="", data=None, range=Range()):
+        self.title = title
+        self.data = data
+        self.range = range
+
+    def copy(self) -> "Axis":
+        return Axis(self.title, self.data, self.range)
+
+    def __repr__(self):
+        return f"Axis({self.title!r}, range={tuple(self.range)})"
+
+
+class Outs:
+    """
+    Out channels: titles and their arrays, with O(1) lookup by title.
+    `data` items are array-likes: numpy arrays, memmap, lazy hdf5 datasets.
+    `store` is the contiguous (nchannels, ...) array the channels are views of, if any.
+    """
+    __slots__ = ("titles", "data", "store", "_index")
+
+    def __init__(self, titles=(), data=(), store=None):
+        self.titles = list(titles)
+        self.data = list(data)
+        self.store = store
+        self._index = {}
+        for i, title in enumerate(self.titles):
+            # first one wins, like list.index
+            self._index.setdefault(title, i)
+
+    def index(self, title) -> int:
+        """ raises KeyError if `title` is not an out """
+        return self._index[title]
+
+    def __getitem__(self, title):
+        return self.data[self._index[title]]
+
+    def __contains__(self, title):
+        return title in self._index
+
+    def __len__(self):
+        return len(self.titles)
+
+    def copy(self) -> "Outs":
+        return Outs(self.titles, self.data, self.store)
+
+    def __repr__(self):
+        return f"Outs({self.titles!r})"
+
+
+class SweepData:
+    """
+    A loaded sweep (what loaders return and ReadfileData.data_dict holds).
+    1d: x and out are used. 2d: out arrays are (x, y) shaped.
+    N-d (hdf5): sweep_dim is 2, out items are (x, y, *extra_axes) shaped H5SlabDataset,
+    displayed as the 2d slab at the `slab` indices of extra_axes.
+    """
+    __slots__ = (
+        "sweep_dim", "x", "y", "out",
+        "extra_axes", "slab",
+        "alternate", "beforewait",
+        "config", "meta",
+        "sweep_time", # epoch [beginning, end]
+    )
+
+    def __init__(self, sweep_dim=2, x=None, y=None, out=None,
+                 alternate=False, beforewait=True, config=(), meta=(), sweep_time=None,
+                 extra_axes=(), slab=()):
+        self.sweep_dim = sweep_dim
+        self.x = x if x is not None else Axis()
+        self.y = y if y is not None else Axis()
+        self.out = out if out is not None else Outs()
+        self.extra_axes = list(extra_axes)
+        self.slab = tuple(slab)
+        self.alternate = alternate
+        self.beforewait = beforewait
+        self.config = config
+        self.meta = meta
+        self.sweep_time = sweep_time
+
+    def copy(self) -> "SweepData":
+        """ structural copy: new containers, arrays and headers are shared """
+        return SweepData(
+            self.sweep_dim, self.x.copy(), self.y.copy(), self.out.copy(),
+            self.alternate, self.beforewait, self.config, self.meta, self.sweep_time,
+            [axis.copy() for axis in self.extra_axes], self.slab
+        )
+
+    def update(self, updates: dict):
+        """ set attributes from a dict, ex: {"alternate": False} """
+        for key, value in updates.items():
+            setattr(self, key, value)
+
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return f"SweepData(sweep_dim={self.sweep_dim}, x={self.x!r}, y={self.y!r}, out={self.out!r})"
@@ -0,0 +1,118 @@
+import io
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+from PyQt5.QtCore import QObject
+
+from src.QuickThread import QuickThread
+
+
+THUMB_SIZE = (320, 240) # px
+THUMB_DPI = 100
+THUMB_COLORS = 64 # palette of the stored png
+THUMB_MAX_POINTS = 1024 # per axis, the plot data is decimated above
+
+
+def thumbnail_plot_dict(plot_dict) -> dict:
+    """ copy of a plot_dict for the renderer thread, arrays decimated to THUMB_MAX_POINTS.
+    Only that is done in the gui thread: the copy is small whatever the data size.
+    """
+    d = dict(plot_dict)
+    if "img" in d:
+        img = np.asarray(d["img"])
+        steps = [max(1, n // THUMB_MAX_POINTS) for n in img.shape]
+        d["img"] = np.array(img[::steps[0], ::steps[1]])
+    else:
+        x, y = np.asarray(d["x_data"]), np.asarray(d["y_data"])
+        step = max(1, len(x) // THUMB_MAX_POINTS)
+        d["x_data"], d["y_data"] = np.array(x[::step]), np.array(y[::step])
+    return d
+
+def render_thumbnail(plot_dict) -> bytes:
+    """ small png of a (thumbnail_)plot_dict, drawn like MPLView on its own Agg canvas
+    (no pyplot, no gui: can run in any thread)
+    """
+    w, h = THUMB_SIZE
+    fig = Figure(figsize=(w / THUMB_DPI, h / THUMB_DPI), dpi=THUMB_DPI)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.tick_params(labelsize=5, length=2, pad=1)
+
+    if "img" in plot_dict:
+        img = plot_dict["img"]
+        im = ax.imshow(
+            img, origin="lower", aspect="auto", interpolation="nearest",
+            cmap=plot_dict["cmap"], extent=plot_dict["extent"],
+        )
+        if np.isfinite(img).any():
+            im.set_clim(np.nanmin(img), np.nanmax(img))
+    else:
+        ax.plot(plot_dict["x_data"], plot_dict["y_data"], linestyle="-", linewidth=0.8)
+    ax.set_xlabel(plot_dict["x_title"], fontsize=6, labelpad=1)
+    ax.set_ylabel(plot_dict["y_title"], fontsize=6, labelpad=1)
+    if plot_dict.get("grid"):
+        ax.grid(color="#DDDDDD", linewidth=0.5)
+    fig.tight_layout(pad=0.2)
+    canvas.draw()
+
+    image = Image.frombuffer("RGBA", canvas.get_width_height(), canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+    image = image.convert("RGB").quantize(THUMB_COLORS)
+    buf = io.BytesIO()
+    image.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+class ThumbnailRenderer(QObject):
+    """
+    Renders the thumbnails of plots.db in a QuickThread, one at a time.
+    request(rfdata) after rfdata is plotted: skipped if the db already has the
+    thumbnail of this content (rfdata.h), else its plot_dict is rendered and stored.
+    A newer request for a pending file replaces it.
+    """
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.pending = {} # filepath -> (h, thumbnail plot_dict), in request order
+        self.running = None # (filepath, h)
+        self.thread = None
+
+    def request(self, rfdata):
+        if rfdata.h is None or rfdata.plot_dict is None:
+            return # partial view, nothing plotted
+        if self.db.has_fig(rfdata.filepath, rfdata.h):
+            return
+        self.pending.pop(rfdata.filepath, None)
+        self.pending[rfdata.filepath] = (rfdata.h, thumbnail_plot_dict(rfdata.plot_dict))
+        self._next()
+
+    def _next(self):
+        if self.running is None and self.pending:
+            if self.thread is not None:
+                # the previous one has emitted, let it return before dropping it
+                self.thread.wait()
+            filepath = next(iter(self.pending))
+            h, plot_dict = self.pending.pop(filepath)
+            self.running = (filepath, h)
+            self.thread = QuickThread(render_thumbnail, plot_dict)
+            self.thread.sig_finished.connect(self._onRendered)
+            self.thread.sig_error.connect(self._onError)
+            self.thread.start()
+
+    # slots of the QuickThread signals, in the gui thread
+    def _onRendered(self, image_bytes, fn_args, fn_kwargs):
+        (filepath, h), self.running = self.running, None
+        self.db.add_fig(filepath, h, image_bytes)
+        self._next()
+
+    def _onError(self, exception, fn_args, fn_kwargs):
+        (filepath, h), self.running = self.running, None
+        print("Could not render the thumbnail of", filepath, exception)
+        self._next()
+
+    def shutdown(self):
+        self.pending = {}
+        if self.thread is not None:
+            self.thread.wait()
@@ -1,10 +1,11 @@
-from PyQt5.QtWidgets import QWidget, QFileSystemModel, QTreeView, QMenu, QApplication
+from PyQt5.QtWidgets import (
+    QWidget, QFileSystemModel, QTreeView, QMenu, QApplication, QAbstractItemView,
+    QLineEdit, QVBoxLayout,
+)
 from PyQt5.QtGui import QKeyEvent
-from PyQt5.QtCore import Qt, QEvent, pyqtSignal
+from PyQt5.QtCore import Qt, QEvent, pyqtSignal, QSortFilterProxyModel, QTimer
 import os
 
-from src.ReadfileData import h5_preview_results_group
-
 from enum import Enum, auto
 
 class ItemType(Enum):
@@ -19,6 +20,8 @@ class FileType(Enum):
 
 class FileTreeView(QWidget):
     sig_askOpenFile = pyqtSignal(str, dict)
+    sig_askOpenFiles = pyqtSignal(list, dict)
+    sig_rootChanged = pyqtSignal(str)
 
     def __init__(self, main_view):
         super().__init__()
@@ -26,14 +29,34 @@ class FileTreeView(QWidget):
         self.clipboard = QApplication.clipboard()
 
         self.model = QFileSystemModel()
+        # view indexes are proxy indexes, see filePath
+        self.proxy = SearchFilterProxy()
+        self.proxy.setSourceModel(self.model)
         self.view = QTreeView()
-        self.view.setModel(self.model)
+        self.view.setModel(self.proxy)
+
+        # search box: filters the tree on the indexed files (Crawler, DBPlots.search)
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search headers, axes, titles... (ex: axes:B 2026-10)")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_timer = QTimer()
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200) # search when the typing stops
+        self.search_timer.timeout.connect(self.applySearch)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        self.model.directoryLoaded.connect(self.onDirectoryLoaded)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.search_box)
+        layout.addWidget(self.view)
 
         self.new_tab_asked = False
 
         # arrange columns
         self.view.setColumnHidden(2, True)  # hide type
         self.view.setColumnWidth(0, 300)  # resize name
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
 
         # right click menu
         self.view.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -61,23 +84,31 @@ class FileTreeView(QWidget):
                     ("Open in new tab", lambda: (setattr(self, "new_tab_asked", True), self.askOpenCurrentIndex())),
                     ("Open in notepad", self.openInTE),
                 ]
-
-                match self.get_file_type(path):
-                    case FileType.HDF5_WITH_RESULT:
-                        actions += h5_preview_results_group(
-                            path,
-                            lambda res_grp: [
-                                (f"{group_name}.{res_name}", lambda g=group_name, r=res_name: self.onOpenResultGroup(g, r))
-                                for group_name in res_grp
-                                for res_name in res_grp[group_name].attrs["result_data_names"]
-                            ],
-                        )
+                if len(self.selectedFilePaths()) > 1:
+                    actions.append(("Open all selected", self.askOpenSelected))
+
+                # usually probed on selection already. Never probed in the gui thread
+                # (network drives): listed on the next right click
+                summary = self.h5_probe().cached(path) if path.endswith(".hdf5") else None
+                if path.endswith(".hdf5") and summary is None:
+                    self.h5_probe().request(path)
+                    actions.append(("Results: probing...", None))
+                elif summary is not None:
+                    for group in summary.groups:
+                        actions.append((f"{group.name} (all results)", lambda g=group.name: self.onOpenResultGroup(g, None)))
+                        actions += [
+                            (f"{group.name}.{res.name}", lambda g=group.name, r=res.name: self.onOpenResultGroup(g, r))
+                            for res in group.results
+                        ]
 
             case ItemType.DIR:
                 actions = [("Open", self.openDir)]
 
         for name, fn in actions:
-            menu.addAction(name, fn)
+            if fn is None:
+                menu.addAction(name).setEnabled(False)
+            else:
+                menu.addAction(name, fn)
 
         ## general
         menu.addAction("Copy path", self.copyPath)
@@ -93,15 +124,24 @@ class FileTreeView(QWidget):
         menu.addAction("Refresh", self.refresh)
         return menu
 
+    def filePath(self, index) -> str:
+        """ path of a view index """
+        return self.model.filePath(self.proxy.mapToSource(index))
+
     def get_type(self, index) -> ItemType:
-        if self.model.isDir(index):
+        if self.model.isDir(self.proxy.mapToSource(index)):
             return ItemType.DIR
         else:
             return ItemType.FILE
         
+    def h5_probe(self):
+        return self.main_view.hlog.h5_probe
+
     def get_file_type(self, path) -> FileType:
+        """ from the H5Probe cache, HDF5 while the file is not probed yet """
         if path.endswith(".hdf5"):
-            if h5_preview_results_group(path):
+            summary = self.h5_probe().cached(path)
+            if summary is not None and summary.has_results:
                 return FileType.HDF5_WITH_RESULT
             return FileType.HDF5
 
@@ -114,7 +154,7 @@ class FileTreeView(QWidget):
         index = self.view.indexAt(pos)
         if not index.isValid():
             return
-        menu = self.makeMenu(self.get_type(index), self.model.filePath(index))
+        menu = self.makeMenu(self.get_type(index), self.filePath(index))
         menu.exec_(self.view.mapToGlobal(pos))
 
     def onKeyPress(self, event):
@@ -188,22 +228,32 @@ class FileTreeView(QWidget):
                 self.main_view.preview_widget.clear()
 
             case ItemType.FILE:
-                path = self.model.filePath(current)
+                path = self.filePath(current)
                 file_type = self.get_file_type(path)
 
                 if file_type is FileType.HDF5_WITH_RESULT:
-                    h5_preview_results_group(
-                        path,
-                        handler=lambda results_group: 
-                            self.main_view.preview_widget.showResultGroup(results_group,
-                            self.onOpenResultGroup)
-                    )
+                    self.showResultGroup(self.h5_probe().cached(path))
+                if file_type in (FileType.HDF5, FileType.HDF5_WITH_RESULT):
+                    # checked in the background, see onProbed
+                    self.h5_probe().request(path)
 
                 if png := self.main_view.hlog.db.get_fig(path):
                     self.main_view.preview_widget.showPng(png)
 
 
-    def onOpenResultGroup(self, group_name, result_name):
+    def onProbed(self, path, summary):
+        """ H5Probe.sig_probed: new or changed structure of `path` """
+        if path == self.filePath(self.view.currentIndex()):
+            self.main_view.preview_widget.dict.clear()
+            self.main_view.preview_widget.dict.hide()
+            if summary.has_results:
+                self.showResultGroup(summary)
+
+    def showResultGroup(self, summary):
+        self.main_view.preview_widget.showResultGroup(summary.groups, self.onOpenResultGroup)
+
+    def onOpenResultGroup(self, group_name, result_name=None):
+        """ result_name None: the whole group """
         self.askOpenCurrentIndex(
             loading_kwargs={
                 "h5": {"group_name": group_name, "result_name": result_name}
@@ -218,7 +268,7 @@ class FileTreeView(QWidget):
             self.new_tab_asked = True
         
         index = self.view.currentIndex()
-        path = self.model.filePath(index)
+        path = self.filePath(index)
 
         match self.get_type(index):
             case ItemType.FILE:
@@ -226,40 +276,140 @@ class FileTreeView(QWidget):
             case ItemType.DIR:
                 pass
 
+    def selectedFilePaths(self) -> list:
+        return [
+            self.filePath(index)
+            for index in self.view.selectionModel().selectedRows(0)
+            if self.get_type(index) is ItemType.FILE
+        ]
+
+    def askOpenSelected(self):
+        self.sig_askOpenFiles.emit(self.selectedFilePaths(), {})
+
     def changePath(self, path):
         if not os.path.exists(path):
             self.main_view.write("Path does not exist: " + path)
             return
         self.model.setRootPath(path)
-        self.view.setRootIndex(self.model.index(path))
+        self.proxy.setRoot(path)
+        self.view.setRootIndex(self.proxy.mapFromSource(self.model.index(path)))
+        if self.search_box.text().strip():
+            # the results were queried under the previous root
+            self.search_timer.stop()
+            self.applySearch()
         print("Path changed to:", path)
+        self.sig_rootChanged.emit(path)
+
+    def applySearch(self):
+        text = self.search_box.text().strip()
+        root = self.model.rootPath()
+        if not text:
+            self.proxy.setPaths(None)
+        else:
+            paths = self.main_view.hlog.db.search(text, root=root)
+            self.proxy.setPaths(paths)
+            self.main_view.write(f"Search '{text}': {len(paths)} files")
+            for path in paths[:self.proxy.MAX_EXPANDED]:
+                # known to the model: its directory is loaded, see onDirectoryLoaded
+                self.model.index(path)
+        self.view.setRootIndex(self.proxy.mapFromSource(self.model.index(root)))
+        for path in self.proxy.expanded_dirs:
+            self.onDirectoryLoaded(path)
+
+    def onDirectoryLoaded(self, path):
+        """ directories leading to search results are expanded """
+        if self.proxy.paths is not None and self.proxy.isExpanded(path):
+            index = self.proxy.mapFromSource(self.model.index(path))
+            if index.isValid():
+                self.view.expand(index)
 
     def openInTE(self):
         # try to open in text editor
         from PyQt5.QtGui import QDesktopServices
         from PyQt5.QtCore import QUrl
         index = self.view.currentIndex()
-        path = self.model.filePath(index)
+        path = self.filePath(index)
         if not QDesktopServices.openUrl(QUrl.fromLocalFile(path)):
             self.main_view.write(f"Could not open in text editor: {path}")
 
     def goUpDir(self):
-        path = self.model.filePath(self.view.rootIndex())
+        path = self.filePath(self.view.rootIndex())
         path = os.path.dirname(path)
         self.changePath(path)
 
     def openDir(self):
         index = self.view.currentIndex()
-        path = self.model.filePath(index)
+        path = self.filePath(index)
         self.changePath(path)
 
     def copyPath(self):
         index = self.view.currentIndex()
-        path = self.model.filePath(index)
+        path = self.filePath(index)
         self.clipboard.setText(path)
         self.main_view.write("Copied: " + path)
 
     def refresh(self):
-        path = self.model.filePath(self.view.rootIndex())
+        path = self.filePath(self.view.rootIndex())
         self.model.setRootPath("")
         self.model.setRootPath(path)
+
+
+def norm_path(path) -> str:
+    """ comparable path: QFileSystemModel uses '/', os.walk the native separator """
+    return os.path.normcase(os.path.normpath(path))
+
+def is_under(path, root) -> bool:
+    """ path is root or inside it, both norm_path """
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class SearchFilterProxy(QSortFilterProxyModel):
+    """
+    Filter of the file tree on search results: shows only the files of `paths`
+    and the directories leading to them (and to the root of the tree).
+    paths None: no filter.
+    """
+
+    MAX_EXPANDED = 500 # directories of the first results only are expanded
+
+    def __init__(self):
+        super().__init__()
+        self.paths = None # set of norm_path
+        self.dirs = set() # norm_path of the directories to show
+        self.expanded = set() # norm_path of the directories to expand
+        self.expanded_dirs = [] # same, as given (for QFileSystemModel.index)
+        self.root = ""
+
+    def setRoot(self, root):
+        self.root = norm_path(root)
+        if self.paths is not None:
+            self.invalidateFilter()
+
+    def setPaths(self, paths):
+        self.paths, self.dirs, self.expanded, self.expanded_dirs = None, set(), set(), []
+        if paths is not None:
+            paths = [path for path in paths if self.isUnder(path)]
+            self.paths = {norm_path(path) for path in paths}
+            for i, path in enumerate(paths):
+                parent = os.path.dirname(path)
+                while norm_path(parent) not in self.dirs and is_under(norm_path(parent), self.root):
+                    self.dirs.add(norm_path(parent))
+                    if i < self.MAX_EXPANDED:
+                        self.expanded.add(norm_path(parent))
+                        self.expanded_dirs.append(parent)
+                    parent = os.path.dirname(parent)
+        self.invalidateFilter()
+
+    def isUnder(self, path) -> bool:
+        return is_under(norm_path(path), self.root)
+
+    def isExpanded(self, path) -> bool:
+        return norm_path(path) in self.expanded
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.paths is None:
+            return True
+        model = self.sourceModel()
+        path = norm_path(model.filePath(model.index(source_row, 0, source_parent)))
+        # results, directories leading to them, the root and the directories above it
+        return path in self.paths or path in self.dirs or is_under(self.root, path)
@@ -75,7 +75,7 @@ class FilterTreeView:
 
         p = self.parameters
         data_dict = rfdata.data_dict
-        out_titles = data_dict['out']['titles']
+        out_titles = data_dict.out.titles
 
         p.param('Filter', 'Type').clearChildren()
         try:
@@ -85,13 +85,13 @@ class FilterTreeView:
             # known error: plot 1d, then plot 2d, histogram lbl has never been connected so it can't be disconnect
             pass
 
-        if rfdata.data_dict['sweep_dim'] == 1:
+        if rfdata.data_dict.sweep_dim == 1:
             p.param('Filter', 'Type').setLimits(d1_filters)
             #p.param('1d sweep').show()
             p.param('2d sweep').hide()
             p.param('Plot 2d').hide()
             self.displayed_dim = 1
-        elif rfdata.data_dict['sweep_dim'] == 2:
+        elif rfdata.data_dict.sweep_dim == 2:
             p.param('Filter', 'Type').setLimits(d2_filters)
             #p.param('1d sweep').hide()
             p.param('2d sweep').show()
@@ -14,7 +14,6 @@ from matplotlib.widgets import Cursor
 from widgets.MPLElements import ResizableLine, Markers
 from widgets.MPLToolbar import MPLToolbar
 
-from copy import deepcopy
 
 class MPLView(QWidget):
     
@@ -81,7 +80,7 @@ class MPLView(QWidget):
         self.ax.add_artist(self.hmarkers.line1); self.ax.add_artist(self.hmarkers.line2)
         self.ax.add_artist(self.resizable_line.line)
 
-        if rfdata.data_dict["sweep_dim"] == 1:
+        if rfdata.data_dict.sweep_dim == 1:
             # adding artists
             plotkw = {'marker': 'o', 'linestyle': '-', 'markersize': 3, 'linewidth': 1}
             self.line = self.ax.plot(0, 0, **plotkw)[0]
@@ -98,7 +97,7 @@ class MPLView(QWidget):
             self.last_plot_dict = {}
             self.figure.tight_layout()
 
-        elif rfdata.data_dict["sweep_dim"] == 2:
+        elif rfdata.data_dict.sweep_dim == 2:
             self.im = self.ax.imshow(
                 np.full((1, 1), np.nan), origin='lower', 
                 aspect='auto', 
@@ -125,9 +124,9 @@ class MPLView(QWidget):
             update using the function in self.plot_fns
         some special cases are treated first, with a pop.
         """
-        d = deepcopy(rfdata.plot_dict)
+        d = dict(rfdata.plot_dict)
         last_d = self.last_plot_dict
-        self.last_plot_dict = deepcopy(d) # SAVE for the future update
+        self.last_plot_dict = snapshot_plot_dict(d) # SAVE for the future update
 
         need_redraw = False
         # SPECIAL CASE
@@ -170,9 +169,9 @@ class MPLView(QWidget):
             update using the function in self.plot_fns
         some special cases are treated first, with a pop.
         """
-        d = deepcopy(rfdata.plot_dict)
+        d = dict(rfdata.plot_dict)
         last_d = self.last_plot_dict
-        self.last_plot_dict = deepcopy(d) # SAVE for the future update
+        self.last_plot_dict = snapshot_plot_dict(d) # SAVE for the future update
 
         # SPECIAL CASES
         ## CBAR
@@ -284,3 +283,12 @@ def set_1d_ax_lim(ax, x_data, y_data, padding_factor=0.05):
     y_padding = padding_factor*(np.nanmax(y_data)-np.nanmin(y_data))
     ax.set_xlim(np.nanmin(x_data)-x_padding, np.nanmax(x_data)+x_padding)
     ax.set_ylim(np.nanmin(y_data)-y_padding, np.nanmax(y_data)+y_padding)
+
+def snapshot_plot_dict(plot_dict):
+    """ shallow copy of a plot_dict, arrays are copied: they can be views
+    of buffers refilled in place on reload, which would hide the change.
+    """
+    return {
+        key: np.array(val) if isinstance(val, np.ndarray) else val
+        for key, val in plot_dict.items()
+    }
@@ -1,5 +1,5 @@
 from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QMainWindow, QSplitter, QTabWidget
+from PyQt5.QtWidgets import QMainWindow, QSplitter, QTabWidget, QLabel
 from PyQt5.QtCore import Qt
 import pyqtgraph as pg
 
@@ -14,11 +14,13 @@ from widgets.CustomQWidgets import CustomTabWidget
 from widgets.PreviewWidget import PreviewWidget
 
 from src.ReadfileData import ReadfileData
+from src.QuickThread import QuickThread
+from src.AutoUpdate import AutoUpdatePolicy
 from src.ReadfileData import PLOT_DICT_1D_FORMAT, PLOT_DICT_2D_FORMAT
 
 import numpy as np
 import os
-from copy import deepcopy
+import time
 
 
 class MainView(QMainWindow):
@@ -29,6 +31,7 @@ class MainView(QMainWindow):
     def __init__(self, hlog="to_remove"):
         super().__init__()
         self.hlog = hlog
+        self.reloads = 0 # auto update reloads running, read by the Crawler thread
         self.setWindowTitle('hlog')
         self.resize(1000, 600)
         icon = QIcon('./resources/icon.png')
@@ -47,7 +50,7 @@ class MainView(QMainWindow):
 
         self.file_preview_splitter = QSplitter(Qt.Orientation.Vertical)
         self.preview_widget = PreviewWidget()
-        self.file_preview_splitter.addWidget(self.file_tree.view)
+        self.file_preview_splitter.addWidget(self.file_tree)
         self.file_preview_splitter.addWidget(self.preview_widget.dict)
         self.file_preview_splitter.addWidget(self.preview_widget.image)
 
@@ -59,6 +62,10 @@ class MainView(QMainWindow):
         self.v_splitter.setSizes([300, 500])
         ##
 
+        # number of loads waiting/running, see LoadScheduler
+        self.load_queue_label = QLabel()
+        self.statusBar().addPermanentWidget(self.load_queue_label)
+
     def layoutNewTab(self, new_name:str):
         """ Build a new tab layout:
         creates the view/widgets
@@ -115,8 +122,14 @@ class MainView(QMainWindow):
 
     def closeTab(self, index=None):
         """ closeTab by index, else the current one. """
-        if not index:
+        if index is None:
             index = self.graphic_tabs.currentIndex()
+        layout = self.graphic_tabs.widget(index)
+        if (thread := getattr(layout, "reload_thread", None)) is not None:
+            # auto update reload in flight, its result is dropped
+            thread.wait()
+        if (rfdata := getattr(layout, "rfdata", None)) is not None:
+            rfdata.close()
         self.graphic_tabs.removeTab(index)
 
     def write(self, text):
@@ -124,22 +137,50 @@ class MainView(QMainWindow):
         print(text)
         self.statusBar().showMessage(text)
 
+    def setLoadQueueDepth(self, depth:int):
+        self.load_queue_label.setText(f"loading: {depth}" if depth else "")
+
     def onFileOpened(self, rfdata, new_tab_asked:bool, add_to_db=True):
         """ called when a thread has finished loading the rfdata object
         Create the new layout, on a new tab if asked.
-        Create the update_fn function, to update the graph based on changes on the trees by user.
         """
-        self.block_update = True
-        
         get_layout = {
             True: self.layoutNewTab,
             False: self.layoutCurrentTab
         }[new_tab_asked]
         layout = get_layout(new_name=rfdata.filename)
+        self.showInLayout(layout, rfdata)
+
+        if add_to_db:
+            self.hlog.thumbnails.request(rfdata)
+
+    def onFileRefined(self, partial, rfdata):
+        """ swap the full rfdata in the tab showing its partial version (progressive loading) """
+        layout = self.layoutOf(partial)
+        if layout is None:
+            # tab closed or showing another file meanwhile
+            rfdata.close()
+            return
+        self.showInLayout(layout, rfdata)
+        self.hlog.thumbnails.request(rfdata)
+
+    def showInLayout(self, layout, rfdata):
+        """ Tell the views of `layout` about rfdata.
+        Create the update_fn function, to update the graph based on changes on the trees by user.
+        """
+        self.block_update = True
+
         sweep_tree  = layout.sweep_tree
         filter_tree = layout.filter_tree
         graph = layout.graph
 
+        # release the file followed by the previous rfdata of this tab
+        previous = getattr(layout, "rfdata", None)
+        if previous is not None and previous is not rfdata:
+            previous.close()
+        layout.rfdata = rfdata
+        layout.auto_update = AutoUpdatePolicy()
+
         # disconnect signals
         filter_tree.parameters.sigTreeStateChanged.disconnect()
         sweep_tree.parameters.sigTreeStateChanged.disconnect()
@@ -164,9 +205,6 @@ class MainView(QMainWindow):
         self.block_update = False
 
         layout.update_fn()
-        
-        if add_to_db:
-            self.hlog.db.add_fig(rfdata, graph.figure)
 
     def prepare_and_send_plot_dict(self,
         rfdata:ReadfileData,
@@ -183,12 +221,12 @@ class MainView(QMainWindow):
         d = rfdata.data_dict
         transpose_checked = filter_tree.transposeChecked()
         x_title, y_title = sweep_tree.get_xy_titles(transpose=transpose_checked)
-        if d["sweep_dim"] == 1:
+        if d.sweep_dim == 1:
 
             x_data = rfdata.get_data(x_title)
             y_data = rfdata.get_data(y_title)
             y_data, y_mod_title = filter_tree.applyOnData(y_data, y_title)
-            plot_dict = deepcopy(PLOT_DICT_1D_FORMAT)
+            plot_dict = dict(PLOT_DICT_1D_FORMAT)
             plot_dict.update({
                 "x_title": x_title,
                 "y_title": y_mod_title,
@@ -199,15 +237,16 @@ class MainView(QMainWindow):
             rfdata.plot_dict = plot_dict # saved for Traces
             graph.plot1D(rfdata)
 
-        elif d["sweep_dim"] == 2:
+        elif d.sweep_dim == 2:
             out_title = sweep_tree.get_z_title()
             alternate = sweep_tree.alternate_checked()
+            rfdata.set_slab(sweep_tree.get_slab())
             
             img = rfdata.get_data(out_title, alternate=alternate,
             transpose=transpose_checked)
             img, out_mod_title = filter_tree.applyOnData(img, out_title)
 
-            plot_dict = deepcopy(PLOT_DICT_2D_FORMAT)
+            plot_dict = dict(PLOT_DICT_2D_FORMAT)
             plot_dict.update({
                 "img": img,
                 "x_title": x_title,
@@ -225,12 +264,63 @@ class MainView(QMainWindow):
 
         if filter_tree.autoUpdateChecked() == True and \
             not graph.update_timer.isActive():
-            graph.wait_for_autoupdate(
-                2000,
-                lambda: self.prepare_and_send_plot_dict(
-                    rfdata.reload(), layout
-                )
-            )
+            self.waitForAutoUpdate(rfdata, layout)
+
+    def waitForAutoUpdate(self, rfdata, layout):
+        layout.graph.wait_for_autoupdate(
+            layout.auto_update.interval_ms,
+            lambda: self.autoUpdate(rfdata, layout)
+        )
+
+    def autoUpdate(self, rfdata, layout):
+        """ auto update tick: if the file changed, reload rfdata on a worker thread,
+        replot when it is done. The tick is skipped if the previous reload is still running.
+        """
+        thread = getattr(layout, "reload_thread", None)
+        if thread is not None and thread.isRunning():
+            self.waitForAutoUpdate(rfdata, layout)
+            return
+        if not rfdata.file_changed():
+            layout.auto_update.onUnchanged()
+            self.waitForAutoUpdate(rfdata, layout)
+            return
+        layout.reload_started = time.perf_counter()
+        # the shown channels are read on the worker too
+        layout.reload_thread = QuickThread(ReadfileData.load_next, rfdata, rfdata.shown_titles())
+        layout.reload_thread.sig_finished.connect(self.onAutoUpdateLoaded)
+        layout.reload_thread.sig_error.connect(self.onAutoUpdateError)
+        self.reloads += 1
+        layout.reload_thread.start()
+
+    def layoutOf(self, rfdata):
+        """ layout of the tab showing rfdata, None if not shown anymore """
+        for index in range(self.graphic_tabs.count()):
+            layout = self.graphic_tabs.widget(index)
+            if getattr(layout, "rfdata", None) is rfdata:
+                return layout
+        return None
+
+    def onAutoUpdateLoaded(self, result, fn_args, fn_kwargs):
+        self.reloads -= 1
+        rfdata = fn_args[0]
+        # swapped in the gui thread, between two plots
+        rfdata.swap(*result)
+        layout = self.layoutOf(rfdata)
+        if layout is not None and layout.filter_tree.autoUpdateChecked():
+            self.prepare_and_send_plot_dict(rfdata, layout)
+            cost_ms = (time.perf_counter() - layout.reload_started) * 1000
+            layout.auto_update.onChanged(cost_ms)
+            # armed by prepare_and_send_plot_dict before the cost was known
+            layout.graph.update_timer.start(layout.auto_update.interval_ms)
+
+    def onAutoUpdateError(self, exception, fn_args, fn_kwargs):
+        self.reloads -= 1
+        rfdata = fn_args[0]
+        self.write(f"Could not reload {rfdata.filename}: {exception}")
+        layout = self.layoutOf(rfdata)
+        if layout is not None and layout.filter_tree.autoUpdateChecked():
+            layout.auto_update.onUnchanged()
+            self.waitForAutoUpdate(rfdata, layout)
 
     ### TRACE WINDOW
     def showTraceWindow(self):
@@ -244,12 +334,12 @@ class MainView(QMainWindow):
         self.trace_window.show()
         color = self.trace_window.getColor()
 
-        if rfdata.data_dict['sweep_dim'] == 1:
+        if rfdata.data_dict.sweep_dim == 1:
             x_ax = rfdata.plot_dict["x_data"]
             y_ax = rfdata.plot_dict["y_data"]
             self.trace_window.plotHorizontalTrace(x_ax, y_ax, color)
         
-        elif rfdata.data_dict['sweep_dim'] == 2:
+        elif rfdata.data_dict.sweep_dim == 2:
             extent = rfdata.plot_dict["extent"]
             img = rfdata.plot_dict["img"]
             # gen linspace for x axis from the extent
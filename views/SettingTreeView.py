@@ -74,14 +74,14 @@ class SettingTreeView:
 
         p = self.parameters
         data_dict = rfdata.data_dict
-        out_titles = data_dict['out']['titles']
-        self.dim = dim = rfdata.data_dict['sweep_dim']
+        out_titles = data_dict.out.titles
+        self.dim = dim = rfdata.data_dict.sweep_dim
         if dim == 1:
             # TODO: remove 2dim parameters
             x_title, y_title = out_titles[:2]
         elif dim == 2:
             # TODO: remove 1dim parameters
-            x_title, y_title = rfdata.data_dict['x']['title'], rfdata.data_dict['y']['title']
+            x_title, y_title = rfdata.data_dict.x.title, rfdata.data_dict.y.title
             p.param('ZLabel').setValue(out_titles[0])
             #self.mplkw.param('ZLabel').setValue(out_title)
             #self.mplkw.param('ZLabel').setDefault(out_title)
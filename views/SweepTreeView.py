@@ -38,6 +38,7 @@ class SweepTreeView:
 
 
         self.need_set_data = True
+        self.slab_titles = [] # extra axes of N-d sweeps
         
         def onParamChange(param, changes):
             #print('a param has changed')
@@ -56,15 +57,16 @@ class SweepTreeView:
         p = self.parameters
         p.param('Out').clearChildren()
         p.param('Sweep').clearChildren()
+        self.slab_titles = []
         
         time_taken:str = rfdata.get_time_taken()
         if time_taken != '':
             p.param('Sweep').addChild({'name': 'time', 'type': 'str', 'value': time_taken})
 
         data_dict = rfdata.data_dict
-        out_titles = data_dict['out']['titles']
+        out_titles = data_dict.out.titles
         
-        if data_dict['sweep_dim'] == 1:
+        if data_dict.sweep_dim == 1:
             x_title, y_title = out_titles[:2]
             x_ax = {'name': 'x', 'type': 'list', 'values': out_titles, 'default': x_title}
             y_ax = {'name': 'y', 'type': 'list', 'values': out_titles, 'default': y_title}
@@ -72,34 +74,41 @@ class SweepTreeView:
             p.param('Out', 'x').setValue(out_titles[0])
             p.param('Out', 'y').setValue(out_titles[1])
             
-            x_range = data_dict['x']['range']
+            x_range = data_dict.x.range
             x_sweep = {'name': x_title, 'type': 'group', 'children': [
                 {'name': 'range', 'type': 'str', 'value': range_to_string(x_range), 'readonly': True}]}
             p.param('Sweep').addChildren([x_sweep])
 
-        elif data_dict['sweep_dim'] == 2:
-            x_title, y_title = rfdata.data_dict['x']['title'], rfdata.data_dict['y']['title']
+        elif data_dict.sweep_dim == 2:
+            x_title, y_title = rfdata.data_dict.x.title, rfdata.data_dict.y.title
             x = {'name': 'x', 'type': 'str', 'value': x_title, 'readonly': True, 'visible': False}
             y = {'name': 'y', 'type': 'str', 'value': y_title, 'readonly': True, 'visible': False}
             z = {'name': 'z', 'type': 'list', 'values': out_titles, 'default': out_titles[0]}
             p.param('Out').addChildren([x, y, z])
             p.param('Out', 'z').setValue(out_titles[0])
 
-            x_range, y_range = rfdata.data_dict['x']['range'], rfdata.data_dict['y']['range']
+            x_range, y_range = rfdata.data_dict.x.range, rfdata.data_dict.y.range
             x_sweep = {'name': x_title, 'type': 'group', 'children': [
                 {'name': 'range', 'type': 'str', 'value': range_to_string(x_range), 'readonly': True}]}
             y_sweep = {'name': y_title, 'type': 'group', 'children': [
                 {'name': 'range', 'type': 'str', 'value': range_to_string(y_range), 'readonly': True}]}
             p.param('Sweep').addChildren([x_sweep, y_sweep])
 
-            is_alternate = {'name': 'is_alternate', 'type': 'bool', 'value': data_dict['alternate']}
+            # N-d: one slider per extra axis, selects the displayed slab
+            self.slab_titles = [axis.title for axis in data_dict.extra_axes]
+            for axis, index in zip(data_dict.extra_axes, data_dict.slab):
+                p.param('Sweep').addChild({'name': axis.title, 'type': 'group', 'children': [
+                    {'name': 'range', 'type': 'str', 'value': range_to_string(axis.range), 'readonly': True},
+                    {'name': 'index', 'type': 'slider', 'limits': (0, axis.range.nbpts - 1), 'step': 1, 'value': index}]})
+
+            is_alternate = {'name': 'is_alternate', 'type': 'bool', 'value': data_dict.alternate}
             p.param('Sweep').addChildren([is_alternate])
 
         # logs
-        p.param('Header', 'config').setValue(str(data_dict['config']))
-        p.param('Header', 'meta').setValue(str(data_dict['meta']))
+        p.param('Header', 'config').setValue(str(data_dict.config))
+        p.param('Header', 'meta').setValue(str(data_dict.meta))
         
-        #wait_before = {'name': 'wait_before', 'type': 'str', 'value': str(rfdata.data_dict['beforewait']), 'readonly': True},
+        #wait_before = {'name': 'wait_before', 'type': 'str', 'value': str(rfdata.data_dict.beforewait), 'readonly': True},
         #self.params.param('Sweep').addChildren([is_alternate, wait_before])
         
         #transpose = {'name': 'Transpose', 'type': 'bool', 'value': False}
@@ -119,6 +128,11 @@ class SweepTreeView:
     def alternate_checked(self):
         return self.parameters.param('Sweep', 'is_alternate').value()
 
+    def get_slab(self):
+        """ slider indices of the extra axes, () if not N-d """
+        p = self.parameters
+        return tuple(int(p.param('Sweep', title, 'index').value()) for title in self.slab_titles)
+
     # def show_header_popup(self):
     #     header_text = f"Config:\n{self.parameters.param('Header', 'config').value()}\n\n" \
     #                   f"Meta:\n{self.parameters.param('Header', 'meta').value()}"
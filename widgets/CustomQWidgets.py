@@ -10,7 +10,8 @@ class MiddleClickTabBar(QTabBar):
         if event.button() == Qt.MiddleButton:
             index = self.tabAt(event.pos())
             if index >= 0:
-                self.parent().removeTab(index)
+                # let the owner release the tab (MainView.closeTab)
+                self.parent().tabCloseRequested.emit(index)
         else:
             super().mouseReleaseEvent(event)
 
@@ -10,7 +10,6 @@ from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt
 
 import numpy as np
-import h5py
 
 from typing import Callable
 
@@ -31,9 +30,9 @@ class PreviewWidget(QWidget):
     def showPng(self, png_bytes):
         self.image.showPng(png_bytes)
 
-    def showResultGroup(self, results_group, ask_load_fn):
+    def showResultGroup(self, groups, ask_load_fn):
         self.dict.show()
-        self.dict.set_data(results_group, ask_load_fn)
+        self.dict.set_data(groups, ask_load_fn)
 
     def clear(self):
         self.image.clear()
@@ -101,76 +100,139 @@ class ImgPreview(QLabel):
 
 
 class DictPreview(QTreeWidget):
+    """ Results groups of an hdf5 file, from its H5Summary.
+    Children are created when their parent is first expanded, results by
+    batches of BATCH ("... more" item). The height fits at most MAX_ROWS rows,
+    the rest scrolls.
+    """
+
+    MAX_ROWS = 15
+    BATCH = 200
+
     def __init__(self):
         super().__init__()
 
         self.setColumnCount(2)
         self.setHeaderLabels(["Name", "Info"])
         self.setAlternatingRowColors(True)
+        self.setUniformRowHeights(True)
         self.itemDoubleClicked.connect(self.onItemDoubleClick)
+        self.itemExpanded.connect(self.onItemExpanded)
+        self.itemCollapsed.connect(self.fitHeight)
+
+        self.groups = {} # group_name -> GroupInfo
+        self.ask_load_fn = None
 
     def set_data(
         self,
-        result_group: h5py.Group,
+        groups: tuple,
         ask_load_fn: Callable[[str, str], bool]
     ):
         """
+        groups: GroupInfo of the results section, see H5Probe.H5Summary
         ask_load_fn ignature: ask_load_fn(groupname: str, result_name: str)
+            result_name None: the whole group (double click on "(all results)")
         """
         self.clear()
+        self.groups = {group.name: group for group in groups}
+        self.ask_load_fn = ask_load_fn
 
-        for group_name, group in result_group.items():
-            group_item = QTreeWidgetItem([group_name])
+        # small files open like before: groups and their results shown
+        expand_results = sum(len(group.results) for group in groups) <= self.BATCH
+        for group in groups:
+            group_item = self._lazyItem([group.name, f"{len(group.results)} results"], "group", group.name)
             self.addTopLevelItem(group_item)
+            self.populate(group_item)
             group_item.setExpanded(True)
-
-
-            axes_item = QTreeWidgetItem(["Axes"])
-            results_item = QTreeWidgetItem(["Results"])
-            group_item.addChild(axes_item)
-            group_item.addChild(results_item)
-            axes_item.setExpanded(False)
-            results_item.setExpanded(True)
-
-            data_names = group.attrs["result_data_names"]
-            ax_names = group.attrs["sweeped_ax_names"]
-
-            for ax_name in ax_names:
-                ax = group.get(ax_name)
-                info = f"len={len(ax)} dtype={ax.dtype}"
-                item = QTreeWidgetItem([ax_name, info])
-                item.setData(0, Qt.UserRole, "ax")
-                axes_item.addChild(item)
-            for data_name in data_names:
-                data = group.get(data_name)
-                info = f"{data.shape} {data.attrs.get('axes')}, dtype={data.dtype}"
-                if (res_type:=data.attrs.get("res_type", None)):
-                    info += f" res_type={res_type}"
-                item = QTreeWidgetItem([data_name, info])
-                item.setData(0, Qt.UserRole, "result")
-                item.setData(1, Qt.UserRole, group_name)
-                item.setData(2, Qt.UserRole, data_name)
-                item.setData(3, Qt.UserRole, ask_load_fn)
-                results_item.addChild(item)
+            if expand_results:
+                self.populate(group_item.child(1))
+                group_item.child(1).setExpanded(True)
 
         self.resizeColumnToContents(0)
         self.resizeColumnToContents(1)
+        self.fitHeight()
 
-        # resize fit to height
-        rows = self.model().rowCount()
-        for i in range(self.topLevelItemCount()):
-            rows += self.topLevelItem(i).childCount()
-            for j in range(self.topLevelItem(i).childCount()):
-                rows += self.topLevelItem(i).child(j).childCount()
+    def clear(self):
+        super().clear()
+        self.groups = {}
+
+    def _lazyItem(self, texts, kind, group_name) -> QTreeWidgetItem:
+        """ item whose children are created on expansion """
+        item = QTreeWidgetItem(texts)
+        item.setData(0, Qt.UserRole, kind)
+        item.setData(1, Qt.UserRole, group_name)
+        item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        return item
+
+    def onItemExpanded(self, item):
+        self.populate(item)
+        self.fitHeight()
+
+    def populate(self, item):
+        """ create the children of a lazy item, once """
+        if item.childCount() == 0:
+            group = self.groups.get(item.data(1, Qt.UserRole))
+            match item.data(0, Qt.UserRole):
+                case "group":
+                    item.addChild(self._lazyItem(["Axes", f"{len(group.axes)}"], "axes", group.name))
+                    item.addChild(self._lazyItem(["Results", f"{len(group.results)}"], "results", group.name))
+                    # not on the group itself: a double click there also expands/collapses it
+                    all_item = QTreeWidgetItem(["(all results)", "double click: open all results"])
+                    all_item.setData(0, Qt.UserRole, "all")
+                    all_item.setData(1, Qt.UserRole, group.name)
+                    item.addChild(all_item)
+                case "axes":
+                    for ax in group.axes:
+                        info = f"len={ax.length} dtype={ax.dtype}"
+                        ax_item = QTreeWidgetItem([ax.name, info])
+                        ax_item.setData(0, Qt.UserRole, "ax")
+                        item.addChild(ax_item)
+                case "results":
+                    self.addResults(item, 0)
+            if item.childCount() == 0:
+                item.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicatorWhenChildless)
+
+    def addResults(self, results_item, start):
+        group = self.groups[results_item.data(1, Qt.UserRole)]
+        stop = min(start + self.BATCH, len(group.results))
+        items = []
+        for data in group.results[start:stop]:
+            info = f"{data.shape} {list(data.axes)}, dtype={data.dtype}"
+            if data.res_type:
+                info += f" res_type={data.res_type}"
+            item = QTreeWidgetItem([data.name, info])
+            item.setData(0, Qt.UserRole, "result")
+            item.setData(1, Qt.UserRole, group.name)
+            item.setData(2, Qt.UserRole, data.name)
+            items.append(item)
+        if stop < len(group.results):
+            more = QTreeWidgetItem([f"... {len(group.results) - stop} more", "double click: show more"])
+            more.setData(0, Qt.UserRole, "more")
+            more.setData(2, Qt.UserRole, stop)
+            items.append(more)
+        results_item.addChildren(items)
+
+    def fitHeight(self, *args):
+        """ fit the visible rows, at most MAX_ROWS """
+        rows = 0
+        item = self.topLevelItem(0)
+        while item is not None and rows < self.MAX_ROWS:
+            rows += 1
+            item = self.itemBelow(item)
 
         row_h = self.sizeHintForRow(0) if rows else self.fontMetrics().height() + 6
-        height = self.header().height() + rows * row_h + 2 * self.frameWidth()
+        height = self.header().height() + max(rows, 1) * row_h + 2 * self.frameWidth()
         self.setFixedHeight(height)
-    
 
     def onItemDoubleClick(self, item, column):
-        if item.data(0, Qt.UserRole) == "result":
-            group_name = item.data(1, Qt.UserRole)
-            data_name = item.data(2, Qt.UserRole)
-            ask_load_fn = item.data(3, Qt.UserRole)
-            ask_load_fn(group_name, data_name)
+        match item.data(0, Qt.UserRole):
+            case "result" | "all":
+                group_name = item.data(1, Qt.UserRole)
+                data_name = item.data(2, Qt.UserRole) # None for "(all results)"
+                self.ask_load_fn(group_name, data_name)
+            case "more":
+                results_item = item.parent()
+                start = item.data(2, Qt.UserRole)
+                results_item.removeChild(item)
+                self.addResults(results_item, start)
+                self.fitHeight()